@@ -4,6 +4,7 @@ Knowledge Registry API Client
 Handles all interactions with Supabase knowledge_entries table (registry tier).
 """
 
+import functools
 import os
 from typing import Dict, List, Optional, Any
 from supabase import create_client
@@ -12,6 +13,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
+@functools.lru_cache(maxsize=None)
+def _get_client(url: str, key: str):
+    """
+    Create the Supabase client for a url/key pair.
+    
+    Cached so every registry (one per tool call) shares a client and its
+    HTTP connection pool instead of opening new connections.
+    """
+    return create_client(url, key)
+
+
 class KnowledgeRegistry:
     """Client for Knowledge Kiwi Supabase registry."""
     
@@ -38,13 +50,23 @@ class KnowledgeRegistry:
                 return None
             
             try:
-                self._client = create_client(url, key)
+                self._client = _get_client(url, key)
             except Exception as e:
                 # If client creation fails, return None
                 print(f"Error creating Supabase client: {e}")
                 return None
         return self._client
     
+    @client.setter
+    def client(self, value):
+        """Use a specific client (e.g. a test double) for this registry."""
+        self._client = value
+    
+    @client.deleter
+    def client(self):
+        """Drop the client; the next access re-resolves it from the environment."""
+        self._client = None
+    
     @property
     def is_configured(self) -> bool:
         """Check if Supabase is configured."""
@@ -5,19 +5,32 @@ Knowledge Kiwi CLI Entry Point
 Handles MCP server startup in stdio mode.
 """
 
+import argparse
 import asyncio
+import os
 import sys
 from pathlib import Path
 
 from knowledge_kiwi.server import KnowledgeKiwiMCP
+from knowledge_kiwi.utils.knowledge_resolver import NO_INDEX_ENV
 
 
 def main():
     """Entry point for the CLI"""
+    parser = argparse.ArgumentParser(prog="knowledge-kiwi")
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Search local knowledge by scanning files instead of using the FTS index"
+    )
+    args = parser.parse_args()
+    
+    if args.no_index:
+        os.environ[NO_INDEX_ENV] = "1"
+    
     server = KnowledgeKiwiMCP()
     asyncio.run(server.run())
 
 
 if __name__ == "__main__":
     main()
-
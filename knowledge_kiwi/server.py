@@ -8,7 +8,6 @@ Provides 5 core tools: search, get, manage, link, help.
 
 import asyncio
 import time
-import json
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -25,6 +24,7 @@ from .tools.manage import ManageTool
 from .tools.link import LinkTool
 from .tools.help import HelpTool
 from .utils.analytics import log_tool_execution
+from .utils import jsonio
 
 
 class KnowledgeKiwiMCP:
@@ -32,6 +32,9 @@ class KnowledgeKiwiMCP:
     
     def __init__(self):
         self.server = Server("knowledge-kiwi-mcp")
+        # Kept across calls so its registry result cache (and the resolver's
+        # open indexes) outlive a single search
+        self.search_tool = SearchTool()
         self.setup_tools()
     
     def setup_tools(self):
@@ -266,6 +269,7 @@ class KnowledgeKiwiMCP:
             status = "success"
             error = None
             result = None
+            result_data = None
             project_path = None
             
             try:
@@ -275,14 +279,15 @@ class KnowledgeKiwiMCP:
                     pass
                 
                 if name == "search":
-                    tool = SearchTool()
-                    result = await tool.execute(arguments)
+                    result = await self.search_tool.execute(arguments)
                 elif name == "get":
                     tool = GetTool()
                     result = await tool.execute(arguments)
                 elif name == "manage":
                     tool = ManageTool()
                     result = await tool.execute(arguments)
+                    # Entries may have been published or deleted
+                    self.search_tool.invalidate_cache()
                 elif name == "link":
                     tool = LinkTool()
                     result = await tool.execute(arguments)
@@ -299,7 +304,7 @@ class KnowledgeKiwiMCP:
                 
                 metadata = {}
                 try:
-                    result_data = json.loads(result)
+                    result_data = jsonio.loads(result)
                     if isinstance(result_data, dict):
                         metadata = {
                             "zettel_id": result_data.get("zettel_id"),
@@ -321,7 +326,7 @@ class KnowledgeKiwiMCP:
                     "error": error,
                     "traceback": traceback.format_exc()
                 }
-                result = json.dumps(error_msg, indent=2)
+                result = jsonio.dumps(error_msg, indent=2)
                 return [TextContent(
                     type="text",
                     text=result
@@ -329,10 +334,11 @@ class KnowledgeKiwiMCP:
             finally:
                 duration_sec = time.time() - start_time
                 try:
-                    outputs = None
+                    # Reuse the parse done for metadata where there was one
+                    outputs = result_data
                     try:
-                        if result:
-                            outputs = json.loads(result)
+                        if outputs is None and result:
+                            outputs = jsonio.loads(result)
                     except:
                         outputs = {"result_length": len(result) if result else 0}
                     
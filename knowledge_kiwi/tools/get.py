@@ -1,24 +1,47 @@
 """Get tool for Knowledge Kiwi."""
 
-import json
 from typing import Dict, Any, Optional, Union, List
 from pathlib import Path
 
 from ..api.knowledge_registry import KnowledgeRegistry
 from ..utils.knowledge_resolver import KnowledgeResolver, parse_knowledge_file, write_knowledge_file
+from ..utils import jsonio
 
 
 class GetTool:
     """Get knowledge entry with explicit source selection."""
     
-    def __init__(self):
-        self.resolver = KnowledgeResolver()
-        self.registry = KnowledgeRegistry()
+    def __init__(
+        self,
+        resolver: Optional[KnowledgeResolver] = None,
+        registry: Optional[KnowledgeRegistry] = None,
+        home_dir: Optional[Path] = None
+    ):
+        """
+        Args:
+            resolver: Resolver for local entries (defaults to one for the cwd)
+            registry: Registry client (defaults to one configured from the environment)
+            home_dir: Home directory for "user" downloads (defaults to Path.home())
+        """
+        self.resolver = resolver or KnowledgeResolver()
+        self.registry = registry or KnowledgeRegistry()
+        self._home_dir = home_dir or Path.home()
     
     async def execute(self, arguments: Dict[str, Any]) -> str:
         """
         Get a knowledge entry.
         
+        See _execute_raw() for arguments.
+        
+        Returns:
+            JSON string with entry details
+        """
+        return jsonio.dumps(await self._execute_raw(arguments), indent=2)
+    
+    async def _execute_raw(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get a knowledge entry, returning the result as a dict.
+        
         Args:
             zettel_id: Unique identifier
             source: "local" | "registry" | ["local", "registry"]
@@ -27,10 +50,17 @@ class GetTool:
             destination: Download from registry to "user" | "project" | ["user", "project"] (default: None)
         
         Returns:
-            JSON string with entry details
+            Entry details (or {"error": ...})
         """
         try:
             zettel_id = arguments.get("zettel_id")
+            
+            # Fail fast, before touching the filesystem or the registry
+            if not zettel_id:
+                return {
+                    "error": "zettel_id is required"
+                }
+            
             source = arguments.get("source", "local")
             include_relationships = arguments.get("include_relationships", False)
             include_backlinks = arguments.get("include_backlinks", False)
@@ -44,11 +74,6 @@ class GetTool:
                 elif isinstance(destination, list):
                     download_destinations = destination
             
-            if not zettel_id:
-                return json.dumps({
-                    "error": "zettel_id is required"
-                })
-            
             # Normalize source
             sources = [source] if isinstance(source, str) else source
             
@@ -61,7 +86,7 @@ class GetTool:
                 
                 if resolution["location"]:
                     file_path = Path(resolution["path"])
-                    entry_data = parse_knowledge_file(file_path)
+                    entry_data = parse_knowledge_file(file_path, resolution["stat"])
                     source_location = resolution["location"]
             
             # Check registry (if not found locally or source is registry-only)
@@ -83,7 +108,7 @@ class GetTool:
                     # Download to requested destinations
                     for destination in download_destinations:
                         if destination == "user":
-                            user_dir = Path.home() / ".knowledge-kiwi"
+                            user_dir = self._home_dir / ".knowledge-kiwi"
                             category_dir = user_dir / category
                             category_dir.mkdir(parents=True, exist_ok=True)
                             
@@ -127,9 +152,9 @@ class GetTool:
                                 downloaded_locations.append(str(file_path))
             
             if not entry_data:
-                return json.dumps({
+                return {
                     "error": f"Entry '{zettel_id}' not found in specified source(s)"
-                })
+                }
             
             result = {
                 "zettel_id": entry_data.get("zettel_id"),
@@ -173,10 +198,10 @@ class GetTool:
                 else:
                     result["downloaded_to"] = downloaded_locations
             
-            return json.dumps(result, indent=2)
+            return result
             
         except Exception as e:
-            return json.dumps({
+            return {
                 "error": str(e)
-            })
+            }
 
@@ -1,7 +1,8 @@
 """Help tool for Knowledge Kiwi."""
 
 from typing import Dict, Any
-import json
+
+from ..utils import jsonio
 
 
 class HelpTool:
@@ -11,6 +12,17 @@ class HelpTool:
         """
         Get help with knowledge operations.
         
+        See _execute_raw() for arguments.
+        
+        Returns:
+            JSON string with guidance and examples
+        """
+        return jsonio.dumps(await self._execute_raw(params), indent=2)
+    
+    async def _execute_raw(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get help with knowledge operations, returning the result as a dict.
+        
         Args:
             query: What you need help with
             context: Additional context
@@ -37,8 +49,8 @@ class HelpTool:
         else:
             return self._help_general()
     
-    def _help_create(self) -> str:
-        return json.dumps({
+    def _help_create(self) -> Dict[str, Any]:
+        return {
             "topic": "Creating Knowledge Entries",
             "workflow": [
                 "1. Search first to avoid duplicates: search({'query': 'your topic', 'source': 'local'})",
@@ -65,10 +77,10 @@ class HelpTool:
                 "template - Code/content templates",
                 "workflow - Process documentation"
             ]
-        }, indent=2)
+        }
     
-    def _help_search(self) -> str:
-        return json.dumps({
+    def _help_search(self) -> Dict[str, Any]:
+        return {
             "topic": "Searching Knowledge",
             "workflow": [
                 "1. Search local (offline): search({'query': 'email', 'source': 'local'})",
@@ -91,10 +103,10 @@ class HelpTool:
                 "Combine both sources for comprehensive results",
                 "Filter by entry_type or tags for better results"
             ]
-        }, indent=2)
+        }
     
-    def _help_link(self) -> str:
-        return json.dumps({
+    def _help_link(self) -> Dict[str, Any]:
+        return {
             "topic": "Linking Entries and Collections",
             "workflow": [
                 "1. Link two entries: link({'action': 'link', 'from_zettel_id': '042-email', 'to_zettel_id': '043-spf', 'relationship_type': 'references'})",
@@ -118,10 +130,10 @@ class HelpTool:
                 "reference - Quick reference",
                 "archive - Archived entries"
             ]
-        }, indent=2)
+        }
     
-    def _help_delete(self) -> str:
-        return json.dumps({
+    def _help_delete(self) -> Dict[str, Any]:
+        return {
             "topic": "Deleting Knowledge Entries",
             "workflow": [
                 "1. Delete from local: manage({'action': 'delete', 'zettel_id': '042-email', 'source': 'local', 'confirm': true})",
@@ -162,10 +174,10 @@ class HelpTool:
                 "Registry deletions check for relationships by default",
                 "Set cascade_relationships: true to delete relationships too"
             ]
-        }, indent=2)
+        }
     
-    def _help_publish(self) -> str:
-        return json.dumps({
+    def _help_publish(self) -> Dict[str, Any]:
+        return {
             "topic": "Publishing to Registry",
             "workflow": [
                 "1. Create entry locally: manage({'action': 'create', 'location': 'project', ...})",
@@ -187,10 +199,10 @@ class HelpTool:
                 "Version auto-increments if not specified",
                 "Can publish from project or user space"
             ]
-        }, indent=2)
+        }
     
-    def _help_source_selection(self) -> str:
-        return json.dumps({
+    def _help_source_selection(self) -> Dict[str, Any]:
+        return {
             "topic": "Explicit Source Selection",
             "explanation": "Knowledge Kiwi requires explicit source selection - you choose where to search/read from",
             "source_options": [
@@ -224,10 +236,10 @@ class HelpTool:
                 "Use 'registry' to discover shared knowledge",
                 "Combine both for comprehensive results"
             ]
-        }, indent=2)
+        }
     
-    def _help_general(self) -> str:
-        return json.dumps({
+    def _help_general(self) -> Dict[str, Any]:
+        return {
             "topic": "Knowledge Kiwi Overview",
             "description": "Knowledge Kiwi provides a 5-tool interface for managing your knowledge base",
             "tools": [
@@ -263,5 +275,5 @@ class HelpTool:
                 "Registry (Supabase) - Shared, versioned knowledge"
             ],
             "workflow_examples": "See v2/Knowledge-Kiwi-Workflow-Examples.md for complete examples"
-        }, indent=2)
+        }
 
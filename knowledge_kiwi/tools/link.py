@@ -1,21 +1,39 @@
 """Link tool for Knowledge Kiwi (relationships and collections)."""
 
-import json
 from typing import Dict, Any, Optional, List
 
 from ..api.knowledge_registry import KnowledgeRegistry
+from ..utils import jsonio
+
+
+_ACTIONS = ("link", "create_collection", "get_relationships")
 
 
 class LinkTool:
     """Manage relationships and collections."""
     
-    def __init__(self):
-        self.registry = KnowledgeRegistry()
+    def __init__(self, registry: Optional[KnowledgeRegistry] = None):
+        """
+        Args:
+            registry: Registry client (defaults to one configured from the environment)
+        """
+        self.registry = registry or KnowledgeRegistry()
     
     async def execute(self, arguments: Dict[str, Any]) -> str:
         """
         Manage relationships and collections.
         
+        See _execute_raw() for arguments.
+        
+        Returns:
+            JSON string with operation result
+        """
+        return jsonio.dumps(await self._execute_raw(arguments), indent=2)
+    
+    async def _execute_raw(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Manage relationships and collections, returning the result as a dict.
+        
         Args:
             action: "link" | "create_collection" | "get_relationships"
             from_zettel_id: Source entry ID (link)
@@ -28,42 +46,43 @@ class LinkTool:
             zettel_id: Entry ID (get_relationships)
         
         Returns:
-            JSON string with operation result
+            Operation result (or {"error": ...})
         """
         try:
             action = arguments.get("action")
             
             if not action:
-                return json.dumps({
+                return {
                     "error": "action is required (link, create_collection, or get_relationships)"
-                })
+                }
+            
+            if action not in _ACTIONS:
+                return {
+                    "error": f"Unknown action: {action}"
+                }
             
             if action == "link":
                 return await self._link_entries(arguments)
             elif action == "create_collection":
                 return await self._create_collection(arguments)
-            elif action == "get_relationships":
-                return await self._get_relationships(arguments)
             else:
-                return json.dumps({
-                    "error": f"Unknown action: {action}"
-                })
+                return await self._get_relationships(arguments)
                 
         except Exception as e:
-            return json.dumps({
+            return {
                 "error": str(e)
-            })
+            }
     
-    async def _link_entries(self, args: Dict[str, Any]) -> str:
+    async def _link_entries(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Link two entries with a relationship."""
         from_zettel_id = args.get("from_zettel_id")
         to_zettel_id = args.get("to_zettel_id")
         relationship_type = args.get("relationship_type", "references")
         
         if not from_zettel_id or not to_zettel_id:
-            return json.dumps({
+            return {
                 "error": "from_zettel_id and to_zettel_id are required"
-            })
+            }
         
         valid_types = [
             "references", "contradicts", "extends", "implements",
@@ -71,9 +90,9 @@ class LinkTool:
         ]
         
         if relationship_type not in valid_types:
-            return json.dumps({
+            return {
                 "error": f"Invalid relationship_type. Must be one of: {valid_types}"
-            })
+            }
         
         result = await self.registry.create_relationship(
             from_zettel_id=from_zettel_id,
@@ -82,15 +101,15 @@ class LinkTool:
         )
         
         if "error" in result:
-            return json.dumps(result, indent=2)
+            return result
         
-        return json.dumps({
+        return {
             "status": "success",
             "action": "link",
             "relationship": result.get("relationship")
-        }, indent=2)
+        }
     
-    async def _create_collection(self, args: Dict[str, Any]) -> str:
+    async def _create_collection(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Create a collection of entries."""
         name = args.get("name")
         description = args.get("description")
@@ -98,16 +117,16 @@ class LinkTool:
         collection_type = args.get("collection_type", "topic")
         
         if not name:
-            return json.dumps({
+            return {
                 "error": "name is required for create_collection"
-            })
+            }
         
         valid_types = ["topic", "project", "learning_path", "reference", "archive"]
         
         if collection_type not in valid_types:
-            return json.dumps({
+            return {
                 "error": f"Invalid collection_type. Must be one of: {valid_types}"
-            })
+            }
         
         result = await self.registry.create_collection(
             name=name,
@@ -117,26 +136,26 @@ class LinkTool:
         )
         
         if "error" in result:
-            return json.dumps(result, indent=2)
+            return result
         
-        return json.dumps({
+        return {
             "status": "success",
             "action": "create_collection",
             "collection_id": result.get("collection_id")
-        }, indent=2)
+        }
     
-    async def _get_relationships(self, args: Dict[str, Any]) -> str:
+    async def _get_relationships(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Get relationships for an entry."""
         zettel_id = args.get("zettel_id")
         
         if not zettel_id:
-            return json.dumps({
+            return {
                 "error": "zettel_id is required for get_relationships"
-            })
+            }
         
         relationships = await self.registry.get_relationships(zettel_id)
         
-        return json.dumps({
+        return {
             "zettel_id": zettel_id,
             "relationships": {
                 "outgoing": [
@@ -156,5 +175,5 @@ class LinkTool:
                     for rel in relationships.get("incoming", [])
                 ]
             }
-        }, indent=2)
+        }
 
@@ -1,19 +1,28 @@
 """Manage tool for Knowledge Kiwi (CRUD + publish operations)."""
 
-import json
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
 from ..api.knowledge_registry import KnowledgeRegistry
 from ..utils.knowledge_resolver import KnowledgeResolver, parse_knowledge_file, write_knowledge_file
+from ..utils import jsonio
 
 
 class ManageTool:
     """Unified CRUD operations and publishing."""
     
-    def __init__(self):
-        self.resolver = KnowledgeResolver()
-        self.registry = KnowledgeRegistry()
+    def __init__(
+        self,
+        resolver: Optional[KnowledgeResolver] = None,
+        registry: Optional[KnowledgeRegistry] = None
+    ):
+        """
+        Args:
+            resolver: Resolver for local entries (defaults to one for the cwd)
+            registry: Registry client (defaults to one configured from the environment)
+        """
+        self.resolver = resolver or KnowledgeResolver()
+        self.registry = registry or KnowledgeRegistry()
     
     async def execute(self, arguments: Dict[str, Any]) -> str:
         """
@@ -44,12 +53,12 @@ class ManageTool:
             zettel_id = arguments.get("zettel_id")
             
             if not action:
-                return json.dumps({
+                return jsonio.dumps({
                     "error": "action is required (create, update, delete, or publish)"
                 })
             
             if not zettel_id:
-                return json.dumps({
+                return jsonio.dumps({
                     "error": "zettel_id is required"
                 })
             
@@ -62,12 +71,12 @@ class ManageTool:
             elif action == "publish":
                 return await self._publish_entry(arguments)
             else:
-                return json.dumps({
+                return jsonio.dumps({
                     "error": f"Unknown action: {action}"
                 })
                 
         except Exception as e:
-            return json.dumps({
+            return jsonio.dumps({
                 "error": str(e)
             })
     
@@ -125,7 +134,7 @@ class ManageTool:
         location = args.get("location", "project")
         
         if not title or not content:
-            return json.dumps({
+            return jsonio.dumps({
                 "error": "title and content are required for create"
             })
         
@@ -135,7 +144,7 @@ class ManageTool:
         elif location == "user":
             base_dir = self.resolver.user_knowledge_dir
         else:
-            return json.dumps({
+            return jsonio.dumps({
                 "error": f"Invalid location: {location}. Use 'project' or 'user'"
             })
         
@@ -153,7 +162,7 @@ class ManageTool:
         
         # Check if already exists
         if file_path.exists():
-            return json.dumps({
+            return jsonio.dumps({
                 "error": f"Entry '{zettel_id}' already exists at {file_path}"
             })
         
@@ -170,7 +179,7 @@ class ManageTool:
             source_url=source_url
         )
         
-        return json.dumps({
+        return jsonio.dumps({
             "status": "success",
             "action": "create",
             "zettel_id": zettel_id,
@@ -187,12 +196,12 @@ class ManageTool:
         resolution = self.resolver.resolve_entry(zettel_id, "local")
         
         if not resolution["location"]:
-            return json.dumps({
+            return jsonio.dumps({
                 "error": f"Entry '{zettel_id}' not found in local storage"
             })
         
         file_path = Path(resolution["path"])
-        entry_data = parse_knowledge_file(file_path)
+        entry_data = parse_knowledge_file(file_path, resolution["stat"])
         
         # Update fields
         if "title" in args:
@@ -218,7 +227,7 @@ class ManageTool:
             source_url=entry_data.get("source_url")
         )
         
-        return json.dumps({
+        return jsonio.dumps({
             "status": "success",
             "action": "update",
             "zettel_id": zettel_id,
@@ -244,7 +253,7 @@ class ManageTool:
         cascade_relationships = args.get("cascade_relationships", False)
         
         if not confirm:
-            return json.dumps({
+            return jsonio.dumps({
                 "error": "confirm: true is required for delete"
             })
         
@@ -276,14 +285,14 @@ class ManageTool:
                 
                 # Find entry in specific location
                 if loc == "project":
-                    project_path = self.resolver._check_project_space(zettel_id)
-                    if project_path and project_path.exists():
-                        project_path.unlink()
+                    found = self.resolver._check_project_space(zettel_id)
+                    if found is not None:
+                        found[0].unlink()
                         deleted_from["local"].append("project")
                 elif loc == "user":
-                    user_path = self.resolver._check_user_space(zettel_id)
-                    if user_path and user_path.exists():
-                        user_path.unlink()
+                    found = self.resolver._check_user_space(zettel_id)
+                    if found is not None:
+                        found[0].unlink()
                         deleted_from["local"].append("user")
             
             # If no location specified and nothing found, try resolver (backward compat)
@@ -325,7 +334,7 @@ class ManageTool:
         if errors:
             response["errors"] = errors
         
-        return json.dumps(response, indent=2)
+        return jsonio.dumps(response, indent=2)
     
     async def _publish_entry(self, args: Dict[str, Any]) -> str:
         """Publish entry from local to registry."""
@@ -337,12 +346,12 @@ class ManageTool:
         resolution = self.resolver.resolve_entry(zettel_id, "local")
         
         if not resolution["location"]:
-            return json.dumps({
+            return jsonio.dumps({
                 "error": f"Entry '{zettel_id}' not found in local storage"
             })
         
         file_path = Path(resolution["path"])
-        entry_data = parse_knowledge_file(file_path)
+        entry_data = parse_knowledge_file(file_path, resolution["stat"])
         
         # Publish to registry
         result = await self.registry.publish_entry(
@@ -358,9 +367,9 @@ class ManageTool:
         )
         
         if "error" in result:
-            return json.dumps(result, indent=2)
+            return jsonio.dumps(result, indent=2)
         
-        return json.dumps({
+        return jsonio.dumps({
             "status": "success",
             "action": "publish",
             "zettel_id": zettel_id,
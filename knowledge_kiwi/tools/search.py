@@ -1,24 +1,71 @@
 """Search tool for Knowledge Kiwi."""
 
-import json
+import asyncio
+import heapq
+import itertools
+import time
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Union
 from pathlib import Path
 
 from ..api.knowledge_registry import KnowledgeRegistry
 from ..utils.knowledge_resolver import KnowledgeResolver
+from ..utils import jsonio
+
+# Registry results are reused for identical searches (agent retries and
+# re-rank passes) for a short while; invalidate_cache() drops them early
+_RPC_CACHE_SIZE = 128
+_RPC_CACHE_TTL = 30.0
 
 
 class SearchTool:
     """Search knowledge entries with explicit source selection."""
     
-    def __init__(self):
-        self.resolver = KnowledgeResolver()
-        self.registry = KnowledgeRegistry()
+    def __init__(
+        self,
+        resolver: Optional[KnowledgeResolver] = None,
+        registry: Optional[KnowledgeRegistry] = None
+    ):
+        """
+        Args:
+            resolver: Resolver for local entries (defaults to one for the cwd)
+            registry: Registry client (defaults to one configured from the environment)
+        """
+        self.resolver = resolver or KnowledgeResolver()
+        self.registry = registry or KnowledgeRegistry()
+        self._rpc_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+    
+    def invalidate_cache(self) -> None:
+        """Forget cached registry results (call after the registry changed)."""
+        self._rpc_cache.clear()
     
     async def execute(self, arguments: Dict[str, Any]) -> str:
         """
         Search knowledge entries.
         
+        See _execute_raw() for arguments.
+        
+        Returns:
+            JSON string with search results
+        """
+        return jsonio.dumps(await self._execute_raw(arguments), indent=2)
+    
+    async def search_batch(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several searches concurrently.
+        
+        Args:
+            queries: One execute() arguments dict per search
+        
+        Returns:
+            One result dict per query, in order (errors are returned per query)
+        """
+        return list(await asyncio.gather(*(self._execute_raw(q) for q in queries)))
+    
+    async def _execute_raw(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Search knowledge entries, returning the result as a dict.
+        
         Args:
             query: Search query string
             source: "local" | "registry" | ["local", "registry"]
@@ -28,7 +75,7 @@ class SearchTool:
             limit: Maximum results (default: 10)
         
         Returns:
-            JSON string with search results
+            Search results (or {"error": ...})
         """
         try:
             query = arguments.get("query", "")
@@ -39,50 +86,94 @@ class SearchTool:
             limit = arguments.get("limit", 10)
             
             if not query:
-                return json.dumps({
+                return {
                     "error": "query is required"
-                })
+                }
             
             # Normalize source
             sources = [source] if isinstance(source, str) else source
             
-            results = []
+            searches = []
             
-            # Search local (project + user space)
+            # Search local (project + user space). The scan is blocking file
+            # I/O, so it runs in a worker thread while the registry is queried
             if "local" in sources:
-                local_results = self.resolver.search_local(
+                searches.append(asyncio.to_thread(
+                    self.resolver.search_local,
                     query=query,
                     category=category,
                     entry_type=entry_type,
                     tags=tags,
                     limit=limit
-                )
-                results.extend(local_results)
+                ))
             
             # Search registry
             if "registry" in sources:
-                registry_results = await self.registry.search_entries(
+                searches.append(self._search_registry(
                     query=query,
                     category=category,
                     entry_type=entry_type,
                     tags=tags,
                     limit=limit
-                )
-                results.extend(registry_results)
+                ))
             
-            # Sort by relevance (local results already prioritized by resolver)
-            results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-            results = results[:limit]
+            # Top results by relevance across sources (local results already
+            # prioritized by resolver). nlargest keeps the first-seen order for
+            # ties, same as a stable sort, without sorting everything
+            results = heapq.nlargest(
+                limit,
+                itertools.chain.from_iterable(await asyncio.gather(*searches)),
+                key=lambda x: x.get("relevance_score", 0)
+            )
             
-            return json.dumps({
+            return {
                 "query": query,
                 "source": source,
                 "results_count": len(results),
                 "results": results
-            }, indent=2)
+            }
             
         except Exception as e:
-            return json.dumps({
+            return {
                 "error": str(e)
-            })
+            }
+    
+    async def _search_registry(
+        self,
+        query: str,
+        category: Optional[str],
+        entry_type: Optional[str],
+        tags: Optional[List[str]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Search the registry, reusing recent results for the same search.
+        
+        Returns:
+            Registry entries (a fresh list; the entries are shared with the cache)
+        """
+        key = (query, entry_type, tuple(sorted(tags or ())), category, limit)
+        now = time.monotonic()
+        
+        cached = self._rpc_cache.get(key)
+        if cached is not None and now - cached[0] < _RPC_CACHE_TTL:
+            self._rpc_cache.move_to_end(key)
+            return list(cached[1])
+        
+        entries = await self.registry.search_entries(
+            query=query,
+            category=category,
+            entry_type=entry_type,
+            tags=tags,
+            limit=limit
+        )
+        
+        # search_entries() reports failures as no results; don't pin those
+        if entries:
+            self._rpc_cache[key] = (now, entries)
+            self._rpc_cache.move_to_end(key)
+            if len(self._rpc_cache) > _RPC_CACHE_SIZE:
+                self._rpc_cache.popitem(last=False)
+        
+        return list(entries)
 
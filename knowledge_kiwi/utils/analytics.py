@@ -9,26 +9,201 @@ Provides:
 Logs are stored in ~/.knowledge-kiwi/.runs/history.jsonl
 """
 
-import json
+import bisect
+import functools
+import heapq
+import itertools
 import logging
-from datetime import datetime, timedelta
-from collections import defaultdict
+import operator
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from . import jsonio
 
 logger = logging.getLogger(__name__)
 
+# Serializes appends, so history.idx marks line up with the entries they point at
+_history_lock = threading.Lock()
+# Index of the history file being appended to, kept across log calls so the
+# per-entry cost doesn't grow with history.idx. Guarded by _history_lock
+_history_index: Optional["_HistoryIndex"] = None
+
+# A history.idx mark is written about every this many bytes of history
+_HISTORY_INDEX_GRANULE = 1024 * 1024
+# Chunk size when reading history backwards
+_REVERSE_CHUNK_SIZE = 64 * 1024
+
 
+@functools.lru_cache(maxsize=1)
 def _get_history_file() -> Path:
-    """Get path to history file in user space."""
+    """
+    Get path to history file in user space.
+    
+    Resolved once per process (the home directory doesn't change under a
+    running server).
+    """
     return Path.home() / ".knowledge-kiwi" / ".runs" / "history.jsonl"
 
 
+def _utc_timestamp(ago: timedelta = timedelta(0)) -> str:
+    """
+    The UTC time `ago` before now, formatted as history timestamps are.
+    
+    UTC keeps logged timestamps increasing across DST changes, and the fixed
+    width (microseconds and offset always present) makes them compare
+    correctly as strings. Entries from before timestamps were UTC are naive
+    local times; they compare as if they were UTC.
+    """
+    return (datetime.now(timezone.utc) - ago).isoformat(timespec='microseconds')
+
+
 def _ensure_dir(history_file: Path):
     """Ensure runs directory exists."""
     history_file.parent.mkdir(parents=True, exist_ok=True)
 
 
+class _HistoryIndex:
+    """
+    Sparse (byte offset, timestamp) index over a history file.
+    
+    A mark is appended about every _HISTORY_INDEX_GRANULE bytes as entries are
+    logged, so readers after the last N days can seek past older entries
+    instead of parsing the whole file. It lives next to the history
+    (history.idx). Marks that don't match the history (e.g. the file was
+    rewritten by hand) are detected on read and ignored.
+    """
+    
+    def __init__(self, history_file: Path):
+        self.history_file = history_file
+        self.path = history_file.with_suffix('.idx')
+        self.last_offset = 0
+        # Size of the history after our last append (see _append_index())
+        self.history_size = 0
+    
+    def load(self) -> List[Tuple[int, str]]:
+        """Read the (offset, timestamp) marks, oldest first."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return []
+        
+        marks = []
+        for line in data.splitlines():
+            offset, _, timestamp = line.partition(b'\t')
+            try:
+                marks.append((int(offset), timestamp.decode()))
+            except ValueError:
+                # Torn line from an interrupted write
+                continue
+        return marks
+    
+    def open_for_append(self, history_size: int):
+        """Pick up the last mark, dropping the index if the history was truncated."""
+        marks = self.load()
+        self.last_offset = marks[-1][0] if marks else 0
+        self.history_size = history_size
+        if self.last_offset > history_size:
+            self.reset()
+    
+    def reset(self):
+        """Remove every mark."""
+        self.path.unlink(missing_ok=True)
+        self.last_offset = 0
+    
+    def record(self, offset: int, timestamp: str):
+        """Add a mark for the entry about to be written at offset, if one is due."""
+        if offset - self.last_offset < _HISTORY_INDEX_GRANULE:
+            return
+        with open(self.path, 'ab') as f:
+            f.write(f"{offset}\t{timestamp}\n".encode('utf-8'))
+        self.last_offset = offset
+    
+    def start_offset(self, cutoff: str) -> int:
+        """
+        Get the offset to start reading at to see every entry newer than cutoff.
+        
+        Args:
+            cutoff: ISO timestamp (compared as a string, see get_execution_history())
+        
+        Returns:
+            A byte offset at a line start (0 when the index can't help)
+        """
+        marks = self.load()
+        
+        # Entries are appended in time order (UTC, so DST changes don't
+        # reorder them), so everything before the last mark at or before the
+        # cutoff is older than the cutoff too
+        i = bisect.bisect_right([timestamp for _, timestamp in marks], cutoff)
+        if i == 0:
+            return 0
+        offset, timestamp = marks[i - 1]
+        
+        try:
+            with open(self.history_file, 'rb') as f:
+                f.seek(offset)
+                if jsonio.loads(f.readline()).get('timestamp') != timestamp:
+                    return 0
+        except (OSError, ValueError, AttributeError):
+            return 0
+        return offset
+
+
+def _append_index(history_file: Path, history_size: int) -> _HistoryIndex:
+    """
+    Get the cached index for appending to history_file.
+    
+    history.idx is only re-read when the history path changes or the file
+    shrank since our last append (truncated or replaced); other processes'
+    appends only make it grow. Callers must hold _history_lock.
+    """
+    global _history_index
+    index = _history_index
+    if (
+        index is None
+        or index.history_file != history_file
+        or history_size < index.history_size
+    ):
+        index = _HistoryIndex(history_file)
+        index.open_for_append(history_size)
+        _history_index = index
+    return index
+
+
+def _summarize_value(value: Any, max_value_length: int) -> Any:
+    """Shorten one logged value; only the kept prefix of long values is copied."""
+    if isinstance(value, str):
+        if len(value) > max_value_length:
+            return value[:max_value_length] + "..."
+        return value
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        # Decode just the prefix; a cut multi-byte character becomes U+FFFD
+        view = memoryview(value)
+        text = bytes(view[:max_value_length]).decode('utf-8', 'replace')
+        return text + "..." if view.nbytes > max_value_length else text
+    if isinstance(value, (dict, list)):
+        return f"<{type(value).__name__}>"
+    return value
+
+
+def _summarize(data: Any, max_items: int = 5, max_value_length: int = 100) -> Any:
+    """Summarize logged inputs/outputs: first max_items keys, long values cut."""
+    if not data:
+        return None
+    if isinstance(data, dict):
+        return {
+            k: _summarize_value(v, max_value_length)
+            for k, v in itertools.islice(data.items(), max_items)
+        }
+    if isinstance(data, str) and len(data) > max_value_length:
+        return data[:max_value_length] + "..."
+    return data
+
+
 def log_tool_execution(
     tool_name: str,
     status: str,
@@ -56,52 +231,112 @@ def log_tool_execution(
         The logged execution entry
     """
     history_file = _get_history_file()
-    _ensure_dir(history_file)
-    
-    def summarize(data, max_items=5, max_value_length=100):
-        if not data:
-            return None
-        if isinstance(data, dict):
-            summarized = {}
-            for i, (k, v) in enumerate(data.items()):
-                if i >= max_items:
-                    break
-                if isinstance(v, str) and len(v) > max_value_length:
-                    summarized[k] = v[:max_value_length] + "..."
-                elif isinstance(v, (dict, list)):
-                    summarized[k] = f"<{type(v).__name__}>"
-                else:
-                    summarized[k] = v
-            return summarized
-        if isinstance(data, str) and len(data) > max_value_length:
-            return data[:max_value_length] + "..."
-        return data
     
     entry = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": _utc_timestamp(),
         "tool": tool_name,
         "status": status,
         "duration_sec": round(duration_sec, 2),
         "project": project,
-        "inputs": summarize(inputs),
-        "outputs": summarize(outputs),
+        "inputs": _summarize(inputs),
+        "outputs": _summarize(outputs),
         "error": error,
         "metadata": metadata
     }
     
     entry = {k: v for k, v in entry.items() if v is not None}
     
-    with open(history_file, 'a') as f:
-        f.write(json.dumps(entry) + '\n')
+    line = jsonio.dumpb(entry) + b'\n'
+    _ensure_dir(history_file)
+    with _history_lock, open(history_file, 'ab') as f:
+        # Appends land at the current end of the file
+        offset = f.seek(0, os.SEEK_END)
+        index = _append_index(history_file, offset)
+        index.record(offset, entry["timestamp"])
+        f.write(line)
+        index.history_size = offset + len(line)
     
-    logger.info(f"Logged execution: {tool_name} -> {status} ({duration_sec:.1f}s)")
+    logger.info("Logged execution: %s -> %s (%.1fs)", tool_name, status, duration_sec)
     return entry
 
 
+def _iter_history(
+    days: int,
+    tool_name: Optional[str] = None,
+    project: Optional[str] = None
+) -> Iterator[Dict]:
+    """Yield history entries from the last N days matching the filters, in file order."""
+    history_file = _get_history_file()
+    if not history_file.exists():
+        return
+    
+    # Timestamps order the same as strings as they do as datetimes (see
+    # _utc_timestamp()), so nothing is parsed per entry
+    cutoff = _utc_timestamp(timedelta(days=days))
+    
+    # Start at the first indexed point that can hold entries after the cutoff
+    start = _HistoryIndex(history_file).start_offset(cutoff)
+    try:
+        st = history_file.stat()
+    except FileNotFoundError:
+        return
+    
+    entries, timestamps = _load_history(str(history_file), st.st_mtime_ns, st.st_size, start)
+    if timestamps is None and start:
+        # Out of order (a clock step, or a mix of old local and UTC
+        # timestamps), so entries before the index mark may be newer than
+        # the cutoff too; read the whole file
+        entries, timestamps = _load_history(str(history_file), st.st_mtime_ns, st.st_size, 0)
+    
+    # In time order (the usual case), skip everything up to the cutoff with
+    # one bisect instead of comparing entry by entry
+    first = bisect.bisect_right(timestamps, cutoff) if timestamps is not None else 0
+    
+    for execution in itertools.islice(entries, first, None):
+        if execution['timestamp'] > cutoff:
+            if tool_name and execution.get('tool') != tool_name:
+                continue
+            if project and execution.get('project') != project:
+                continue
+            yield execution
+
+
+@functools.lru_cache(maxsize=1)
+def _load_history(
+    path: str,
+    mtime_ns: int,
+    size: int,
+    start: int
+) -> Tuple[Tuple[Dict, ...], Optional[List[str]]]:
+    """
+    Parse the history file from byte offset start.
+    
+    Cached on the file's mtime/size, so several queries in a row (e.g. stats
+    then history) parse it once; any append changes the key. Only the latest
+    parse is kept, since the history only grows and older keys are dead. The
+    entries are shared between callers and must not be modified.
+    
+    Returns:
+        (entries, their timestamps if the entries are in time order, else None)
+    """
+    # One bulk read, decoded line by line (orjson when available)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        lines = f.read().splitlines()
+    entries = tuple(jsonio.loads(line) for line in lines if line.strip())
+    
+    timestamps = [entry['timestamp'] for entry in entries]
+    # Already-sorted input sorts in linear time
+    if timestamps != sorted(timestamps):
+        timestamps = None
+    return entries, timestamps
+
+
 def get_execution_history(
     days: int = 30, 
     tool_name: Optional[str] = None,
-    project: Optional[str] = None
+    project: Optional[str] = None,
+    limit: Optional[int] = None
 ) -> List[Dict]:
     """
     Load execution history from the last N days.
@@ -110,41 +345,22 @@ def get_execution_history(
         days: Number of days of history to load
         tool_name: Optional filter by tool name
         project: Optional filter by project
+        limit: Optional maximum number of (most recent) entries
         
     Returns:
         List of execution entries, most recent first
     """
-    history_file = _get_history_file()
-    if not history_file.exists():
-        return []
+    executions = _iter_history(days, tool_name=tool_name, project=project)
+    by_time = operator.itemgetter('timestamp')
     
-    cutoff = datetime.now() - timedelta(days=days)
-    executions = []
-    
-    with open(history_file, 'r') as f:
-        for line in f:
-            if line.strip():
-                execution = json.loads(line)
-                exec_time = datetime.fromisoformat(execution['timestamp'])
-                
-                if exec_time > cutoff:
-                    if tool_name and execution.get('tool') != tool_name:
-                        continue
-                    if project and execution.get('project') != project:
-                        continue
-                    executions.append(execution)
-    
-    return sorted(executions, key=lambda x: x['timestamp'], reverse=True)
-
-
-def _make_stats_entry() -> Dict[str, Any]:
-    """Create a fresh stats entry for defaultdict."""
-    return {
-        'success': 0, 
-        'error': 0, 
-        'total_duration': 0.0,
-        'errors': []
-    }
+    if limit is not None:
+        # Top entries only, without sorting the whole history
+        newest = heapq.nlargest(limit, executions, key=by_time)
+    else:
+        newest = sorted(executions, key=by_time, reverse=True)
+    
+    # Copies, since the parsed entries are cached
+    return [dict(e) for e in newest]
 
 
 def tool_stats(
@@ -161,29 +377,30 @@ def tool_stats(
     Returns:
         Dictionary of tool stats
     """
-    executions = get_execution_history(days=days, project=project)
-    stats: Dict[str, Dict[str, Any]] = defaultdict(_make_stats_entry)
+    # Single pass over the history with running counts per tool
+    totals: Counter = Counter()
+    successes: Counter = Counter()
+    durations: Dict[str, float] = defaultdict(float)
+    errors: Dict[str, Counter] = defaultdict(Counter)
     
-    for execution in executions:
+    for execution in _iter_history(days, project=project):
         tool = execution.get('tool', 'unknown')
-        stats[tool]['total_duration'] += execution.get('duration_sec', 0)
+        totals[tool] += 1
+        durations[tool] += execution.get('duration_sec', 0)
         
         if execution.get('status') == 'success':
-            stats[tool]['success'] += 1
-        else:
-            stats[tool]['error'] += 1
-            if execution.get('error'):
-                stats[tool]['errors'].append(execution.get('error'))
+            successes[tool] += 1
+        elif execution.get('error'):
+            errors[tool][execution['error']] += 1
     
     result = {}
-    for tool, s in stats.items():
-        total = s['success'] + s['error']
+    for tool, total in totals.items():
         result[tool] = {
             'total_executions': total,
-            'success_rate': s['success'] / total if total > 0 else 0,
-            'error_rate': s['error'] / total if total > 0 else 0,
-            'avg_duration_sec': s['total_duration'] / total if total > 0 else 0,
-            'common_errors': list(set(s['errors']))[:3]
+            'success_rate': successes[tool] / total,
+            'error_rate': (total - successes[tool]) / total,
+            'avg_duration_sec': durations[tool] / total,
+            'common_errors': [error for error, _ in errors[tool].most_common(3)]
         }
     
     return result
@@ -203,8 +420,46 @@ def recent_failures(
     Returns:
         List of failed executions with details
     """
-    executions = get_execution_history(days=7, project=project)
-    failures = [e for e in executions if e.get('status') == 'error']
-    return failures[:count]
+    history_file = _get_history_file()
+    if not history_file.exists():
+        return []
+    
+    # History is appended in time order (UTC timestamps don't go back at DST
+    # changes; only a backwards clock step can reorder entries), so reading it
+    # backwards can stop at the first entry older than a week or once enough
+    # failures are found
+    cutoff = _utc_timestamp(timedelta(days=7))
+    failures = []
+    for execution in _iter_history_reversed(history_file):
+        if len(failures) >= count:
+            break
+        if execution['timestamp'] <= cutoff:
+            break
+        if execution.get('status') != 'error':
+            continue
+        if project and execution.get('project') != project:
+            continue
+        failures.append(execution)
+    
+    return failures
+
+
+def _iter_history_reversed(history_file: Path) -> Iterator[Dict]:
+    """Yield history entries last line first, reading the file in chunks from the end."""
+    with open(history_file, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        partial = b''
+        while position > 0:
+            size = min(_REVERSE_CHUNK_SIZE, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + partial).split(b'\n')
+            # The first piece may continue in the previous chunk
+            partial = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield jsonio.loads(line)
+        if partial.strip():
+            yield jsonio.loads(partial)
 
 
@@ -0,0 +1,274 @@
+"""Persistent SQLite FTS5 index over local knowledge files."""
+
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .knowledge_resolver import _walk_md, parse_knowledge_file
+
+# Set to keep search indexes somewhere other than the user cache dir
+# ($XDG_CACHE_HOME/knowledge-kiwi, by default ~/.cache/knowledge-kiwi)
+CACHE_DIR_ENV = "KNOWLEDGE_KIWI_CACHE_DIR"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    path TEXT PRIMARY KEY,
+    zettel_id TEXT NOT NULL,
+    title TEXT,
+    content TEXT,
+    category TEXT,
+    tags TEXT,
+    entry_type TEXT,
+    ino INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    ctime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_zettel_id ON entries(zettel_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+    title, content, tags, content='entries', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN
+    INSERT INTO entries_fts(rowid, title, content, tags)
+    VALUES (new.rowid, new.title, new.content, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, title, content, tags)
+    VALUES ('delete', old.rowid, old.title, old.content, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS entries_au AFTER UPDATE ON entries BEGIN
+    INSERT INTO entries_fts(entries_fts, rowid, title, content, tags)
+    VALUES ('delete', old.rowid, old.title, old.content, old.tags);
+    INSERT INTO entries_fts(rowid, title, content, tags)
+    VALUES (new.rowid, new.title, new.content, new.tags);
+END;
+"""
+
+# Bumped when _SCHEMA changes; older indexes are dropped and rebuilt
+_SCHEMA_VERSION = 2
+
+_DROP_SCHEMA = """
+DROP TRIGGER IF EXISTS entries_ai;
+DROP TRIGGER IF EXISTS entries_ad;
+DROP TRIGGER IF EXISTS entries_au;
+DROP TABLE IF EXISTS entries_fts;
+DROP TABLE IF EXISTS entries;
+"""
+
+# The trigram tokenizer only matches terms of at least three characters
+_MIN_MATCH_TERM_LENGTH = 3
+
+
+def index_path(base_dir: Path) -> Path:
+    """
+    Get where the index for a knowledge directory is stored.
+
+    Indexes live in the per-user cache directory rather than inside the
+    knowledge directory (which projects commit), one file per knowledge
+    directory keyed by its resolved path.
+    """
+    cache_dir = os.getenv(CACHE_DIR_ENV)
+    if cache_dir:
+        cache_dir = Path(cache_dir)
+    else:
+        # Outside ~/.knowledge-kiwi, which is itself a knowledge directory
+        xdg_cache = os.getenv("XDG_CACHE_HOME")
+        cache_dir = (Path(xdg_cache) if xdg_cache else Path.home() / ".cache") / "knowledge-kiwi"
+    digest = hashlib.sha256(str(base_dir.resolve()).encode("utf-8")).hexdigest()[:16]
+    return cache_dir / f"index-{digest}.db"
+
+
+class KnowledgeIndex:
+    """
+    Full-text index of the knowledge entries under one base directory.
+
+    Rows are keyed by file path and carry the file's inode, mtime, ctime and
+    size (the same fields as the parse cache) so stale rows can be detected
+    and re-parsed without reading unchanged files.
+    The database lives in the user's cache directory (see index_path()).
+    """
+
+    def __init__(self, base_dir: Path):
+        """
+        Open (or create) the index for a knowledge directory.
+
+        Raises:
+            OSError: If the cache directory cannot be created
+            sqlite3.Error: If the database cannot be opened or SQLite lacks FTS5
+        """
+        self.base_dir = base_dir
+        self.db_path = index_path(base_dir)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Resolvers keep indexes open and search from worker threads; they
+        # serialize access themselves
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            # The index is a cache, so an outdated schema is simply rebuilt
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                self.conn.executescript(_DROP_SCHEMA)
+                self.conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            self.conn.executescript(_SCHEMA)
+        except sqlite3.Error:
+            self.conn.close()
+            raise
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self.conn.close()
+
+    def sync(self, category: Optional[str] = None) -> None:
+        """
+        Bring the index up to date with the files on disk.
+
+        Files whose inode, mtime_ns, ctime_ns or size differ from the stored
+        row are re-parsed (ctime and inode catch same-size rewrites that
+        restore the old mtime),
+        rows for files that no longer exist are dropped.
+
+        Args:
+            category: Only sync this category's subtree (enough before a
+                search filtered to that category)
+        """
+        if category:
+            root = self.base_dir / category
+            prefix = str(root) + os.sep
+            rows = self.conn.execute(
+                "SELECT path, ino, mtime_ns, ctime_ns, size FROM entries "
+                "WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix)
+            )
+        else:
+            root = self.base_dir
+            rows = self.conn.execute("SELECT path, ino, mtime_ns, ctime_ns, size FROM entries")
+        stored = {
+            row["path"]: (row["ino"], row["mtime_ns"], row["ctime_ns"], row["size"])
+            for row in rows
+        }
+
+        with self.conn:
+            # _walk_md skips hidden files (editor lock/backup files)
+            for entry in _walk_md(str(root)):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+
+                # An empty file can't match any query; leaving it in stored
+                # drops a row indexed before it was emptied
+                if not st.st_size:
+                    continue
+
+                key = (st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size)
+                if stored.pop(entry.path, None) != key:
+                    self._upsert(Path(entry.path), st)
+
+            for path_str in stored:
+                self.conn.execute("DELETE FROM entries WHERE path = ?", (path_str,))
+
+    def _upsert(self, file_path: Path, st: os.stat_result) -> None:
+        try:
+            entry_data = parse_knowledge_file(file_path, st)
+        except Exception:
+            # Unparseable files are skipped, same as the scan path
+            self.conn.execute("DELETE FROM entries WHERE path = ?", (str(file_path),))
+            return
+
+        self.conn.execute(
+            """
+            INSERT INTO entries (
+                path, zettel_id, title, content, category, tags, entry_type,
+                ino, mtime_ns, ctime_ns, size
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                zettel_id = excluded.zettel_id,
+                title = excluded.title,
+                content = excluded.content,
+                category = excluded.category,
+                tags = excluded.tags,
+                entry_type = excluded.entry_type,
+                ino = excluded.ino,
+                mtime_ns = excluded.mtime_ns,
+                ctime_ns = excluded.ctime_ns,
+                size = excluded.size
+            """,
+            (
+                str(file_path),
+                entry_data.get("zettel_id"),
+                entry_data.get("title", ""),
+                entry_data.get("content", ""),
+                entry_data.get("category"),
+                json.dumps(entry_data.get("tags", []), default=str),
+                entry_data.get("entry_type"),
+                st.st_ino,
+                st.st_mtime_ns,
+                st.st_ctime_ns,
+                st.st_size,
+            )
+        )
+
+    def search(
+        self,
+        query_terms: List[str],
+        category: Optional[str] = None,
+        entry_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Return candidate entries for the given query terms, best bm25 first.
+
+        Candidates contain every term somewhere in title/content; callers still
+        apply their own scoring. Terms shorter than the trigram width cannot be
+        matched through FTS, so those queries fall back to a table scan over the
+        indexed rows (still without touching the files).
+
+        Returns:
+            List of entry dicts shaped like parse_knowledge_file() output
+        """
+        conditions = []
+        params: List[Any] = []
+
+        if category:
+            prefix = str(self.base_dir / category) + os.sep
+            conditions.append("substr(e.path, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+
+        if entry_type:
+            conditions.append("e.entry_type = ?")
+            params.append(entry_type)
+
+        if query_terms and all(len(t) >= _MIN_MATCH_TERM_LENGTH for t in query_terms):
+            phrases = " AND ".join('"' + t.replace('"', '""') + '"' for t in query_terms)
+            sql = (
+                "SELECT e.*, bm25(entries_fts) AS score FROM entries_fts "
+                "JOIN entries e ON e.rowid = entries_fts.rowid "
+                "WHERE entries_fts MATCH ?"
+            )
+            params.insert(0, "{title content} : (" + phrases + ")")
+            if conditions:
+                sql += " AND " + " AND ".join(conditions)
+            sql += " ORDER BY score"
+        else:
+            sql = "SELECT e.* FROM entries e"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+
+        entries = []
+        for row in self.conn.execute(sql, params):
+            entry = {
+                "zettel_id": row["zettel_id"],
+                "title": row["title"],
+                "content": row["content"],
+                "entry_type": row["entry_type"],
+                "tags": json.loads(row["tags"]) if row["tags"] else [],
+                "path": row["path"],
+            }
+            if row["category"] is not None:
+                entry["category"] = row["category"]
+            entries.append(entry)
+
+        return entries
@@ -0,0 +1,88 @@
+"""
+JSON encoding for tool results.
+
+Uses orjson when it is installed (several times faster on large result
+lists) and falls back to the standard library otherwise. Both backends
+produce the same output: compact separators, raw UTF-8, 2-space indent and
+non-finite floats written as null.
+"""
+
+import json
+import math
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """
+    Serialize obj to a JSON string.
+    
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print when set (orjson always indents by 2)
+    
+    Returns:
+        JSON string
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode()
+        except TypeError:
+            # orjson is stricter (non-str keys, ints over 64 bits); let json decide
+            pass
+    return _stdlib_dumps(obj, indent)
+
+
+def dumpb(obj: Any) -> bytes:
+    """
+    Serialize obj to compact UTF-8 JSON bytes (for writing to binary files).
+    
+    Args:
+        obj: Value to serialize
+    
+    Returns:
+        JSON bytes
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            pass
+    return _stdlib_dumps(obj).encode('utf-8')
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse a JSON string (or bytes)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _stdlib_dumps(obj: Any, indent: Optional[int] = None) -> str:
+    """json.dumps() configured to match orjson's output."""
+    kwargs = {
+        "ensure_ascii": False,
+        "allow_nan": False,
+        "indent": 2 if indent else None,
+        "separators": (",", ": ") if indent else (",", ":"),
+    }
+    try:
+        return json.dumps(obj, **kwargs)
+    except ValueError:
+        # NaN/Infinity: orjson writes null, json would write invalid JSON
+        return json.dumps(_finite(obj), **kwargs)
+
+
+def _finite(obj: Any) -> Any:
+    """Copy of obj with non-finite floats replaced by None."""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
@@ -1,24 +1,60 @@
 """Knowledge resolver for 3-tier storage system with explicit source selection."""
 
+import copy
+import functools
+import heapq
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union, Any
 import yaml
 import re
 
+# Set to disable the persistent search index and always scan files directly
+NO_INDEX_ENV = "KNOWLEDGE_KIWI_NO_INDEX"
+
+# Search indexes kept open per resolver (oldest is closed beyond this)
+_MAX_OPEN_INDEXES = 8
+
+# File scans with at least this many files parse them in a thread pool
+_PARALLEL_PARSE_MIN_FILES = 32
+_PARSE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# libyaml's loader when PyYAML was built with it (same results, much faster)
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class KnowledgeResolver:
     """Resolve knowledge entries from 3-tier storage system with dynamic categories."""
     
-    def __init__(self, project_root: Optional[Path] = None):
+    def __init__(self, project_root: Optional[Path] = None, use_index: Optional[bool] = None):
         """
         Initialize resolver.
         
         Args:
             project_root: Project root directory (defaults to current working directory)
+            use_index: Search through the persistent FTS index (defaults to on
+                unless KNOWLEDGE_KIWI_NO_INDEX is set)
         """
         self.project_root = project_root or Path.cwd()
         self.project_knowledge_dir = self.project_root / ".ai" / "knowledge"
         self.user_knowledge_dir = Path.home() / ".knowledge-kiwi"
+        if use_index is None:
+            use_index = not os.getenv(NO_INDEX_ENV)
+        self.use_index = use_index
+        # Open search indexes by base dir, reused across searches. Searches
+        # may run in worker threads, so index use is serialized by the lock
+        self._indexes: Dict[Path, Any] = {}
+        self._index_lock = threading.Lock()
+    
+    def close(self) -> None:
+        """Close any search indexes held open by this resolver."""
+        with self._index_lock:
+            indexes, self._indexes = self._indexes, {}
+        for index in indexes.values():
+            index.close()
     
     def discover_categories(self, base_dir: Path) -> List[str]:
         """
@@ -29,15 +65,23 @@ class KnowledgeResolver:
         if not base_dir.exists():
             return []
         
-        categories = set()
-        for item in base_dir.rglob("*"):
-            if item.is_dir() and not item.name.startswith('.'):
-                # Get relative path from base_dir
-                rel_path = item.relative_to(base_dir)
-                category_path = str(rel_path).replace('\\', '/')
-                categories.add(category_path)
+        # Adding or removing a directory changes its parent's mtime, so the
+        # tree is unchanged while every directory seen last time is
+        key = str(base_dir)
+        cached = _category_cache.get(key)
+        if cached is not None and _dir_mtimes_unchanged(cached[0]):
+            return list(cached[1])
+        
+        dir_mtimes: Dict[str, int] = {}
+        categories: List[str] = []
+        try:
+            _scan_dirs(key, key, dir_mtimes, categories)
+        except OSError:
+            return []
+        categories.sort()
         
-        return sorted(categories)
+        _category_cache[key] = (dir_mtimes, categories)
+        return list(categories)
     
     def resolve_entry(
         self,
@@ -57,7 +101,8 @@ class KnowledgeResolver:
             {
                 "location": "project" | "user" | "registry" | None,
                 "path": Path | None,
-                "version": str | None
+                "version": str | None,
+                "stat": os.stat_result | None
             }
         """
         # Normalize source to list
@@ -66,21 +111,23 @@ class KnowledgeResolver:
         # Check local sources (project → user)
         if "local" in sources:
             # 1. Check project space first
-            project_path = self._check_project_space(zettel_id, category)
-            if project_path and project_path.exists():
+            found = self._check_project_space(zettel_id, category)
+            if found is not None:
                 return {
                     "location": "project",
-                    "path": project_path,
-                    "version": None
+                    "path": found[0],
+                    "version": None,
+                    "stat": found[1]
                 }
             
             # 2. Check user space
-            user_path = self._check_user_space(zettel_id, category)
-            if user_path and user_path.exists():
+            found = self._check_user_space(zettel_id, category)
+            if found is not None:
                 return {
                     "location": "user",
-                    "path": user_path,
-                    "version": None
+                    "path": found[0],
+                    "version": None,
+                    "stat": found[1]
                 }
         
         # Check registry (only if "registry" in sources and not found locally)
@@ -89,40 +136,50 @@ class KnowledgeResolver:
             return {
                 "location": "registry",
                 "path": None,
-                "version": None
+                "version": None,
+                "stat": None
             }
         
-        return {"location": None, "path": None, "version": None}
+        return {"location": None, "path": None, "version": None, "stat": None}
     
     def _check_project_space(
         self,
         zettel_id: str,
         category: Optional[str] = None
-    ) -> Optional[Path]:
-        """Check project space for entry."""
-        if category:
-            candidate = self.project_knowledge_dir / category / f"{zettel_id}.md"
-            if candidate.exists():
-                return candidate
-        
-        for md_file in self.project_knowledge_dir.rglob(f"{zettel_id}.md"):
-            return md_file
-        
-        return None
+    ) -> Optional[Tuple[Path, os.stat_result]]:
+        """Check project space for entry, returning its path and stat result."""
+        return self._check_space(self.project_knowledge_dir, zettel_id, category)
     
     def _check_user_space(
         self,
         zettel_id: str,
         category: Optional[str] = None
-    ) -> Optional[Path]:
-        """Check user space for entry."""
+    ) -> Optional[Tuple[Path, os.stat_result]]:
+        """Check user space for entry, returning its path and stat result."""
+        return self._check_space(self.user_knowledge_dir, zettel_id, category)
+    
+    def _check_space(
+        self,
+        base_dir: Path,
+        zettel_id: str,
+        category: Optional[str] = None
+    ) -> Optional[Tuple[Path, os.stat_result]]:
+        """
+        Find {zettel_id}.md under base_dir with a single stat per candidate.
+        
+        The stat result doubles as the existence check, so callers don't need
+        to call exists() again.
+        """
         if category:
-            candidate = self.user_knowledge_dir / category / f"{zettel_id}.md"
-            if candidate.exists():
-                return candidate
+            candidate = base_dir / category / f"{zettel_id}.md"
+            st = _stat_or_none(candidate)
+            if st is not None:
+                return candidate, st
         
-        for md_file in self.user_knowledge_dir.rglob(f"{zettel_id}.md"):
-            return md_file
+        for md_file in base_dir.rglob(f"{zettel_id}.md"):
+            st = _stat_or_none(md_file)
+            if st is not None:
+                return md_file, st
         
         return None
     
@@ -141,10 +198,15 @@ class KnowledgeResolver:
         """
         results = []
         
+        # Parse query into normalized terms once for both spaces
+        query_terms = self._parse_search_query(query)
+        if not query_terms:
+            return results
+        
         # Search project space
         project_results = self._search_directory(
             self.project_knowledge_dir,
-            query,
+            query_terms,
             category,
             entry_type,
             tags,
@@ -157,7 +219,7 @@ class KnowledgeResolver:
         existing_zettel_ids = {r["zettel_id"] for r in project_results}
         user_results = self._search_directory(
             self.user_knowledge_dir,
-            query,
+            query_terms,
             category,
             entry_type,
             tags,
@@ -169,9 +231,8 @@ class KnowledgeResolver:
             if r["zettel_id"] not in existing_zettel_ids
         ])
         
-        # Sort by relevance and limit
-        results.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
-        return results[:limit]
+        # Top results by relevance (ties keep project-first order)
+        return heapq.nlargest(limit, results, key=lambda x: x.get("relevance_score", 0))
     
     def _parse_search_query(self, query: str) -> List[str]:
         """
@@ -201,7 +262,9 @@ class KnowledgeResolver:
         title: str,
         content: str,
         category: Optional[str] = None,
-        tags: Optional[List[str]] = None
+        tags: Optional[List[str]] = None,
+        title_hits: Optional[Dict[str, int]] = None,
+        content_hits: Optional[Dict[str, int]] = None
     ) -> float:
         """
         Calculate relevance score based on term matches.
@@ -214,9 +277,15 @@ class KnowledgeResolver:
         - Content contains some terms: 20 * (matches/terms)
         - Category match: +15
         - Tags match: +10
+        
+        title_hits/content_hits are per-term positions from _scan(); when given,
+        the title/content are not searched again.
         """
         title_lower = title.lower()
-        content_lower = (content or "").lower()
+        if title_hits is None:
+            title_hits, _ = self._scan(title_lower, query_terms)
+        if content_hits is None:
+            content_hits, _ = self._scan((content or "").lower(), query_terms)
         category_lower = (category or "").lower() if category else ""
         tags_str = " ".join(tags or []).lower()
         
@@ -227,8 +296,8 @@ class KnowledgeResolver:
             return 100.0
         
         # Count term matches in title
-        title_matches = sum(1 for term in query_terms if term in title_lower)
-        content_matches = sum(1 for term in query_terms if term in content_lower)
+        title_matches = sum(1 for term in query_terms if title_hits[term] != -1)
+        content_matches = sum(1 for term in query_terms if content_hits[term] != -1)
         
         # Calculate score
         score = 0.0
@@ -260,119 +329,367 @@ class KnowledgeResolver:
     def _search_directory(
         self,
         base_dir: Path,
-        query: str,
+        query_terms: List[str],
         category: Optional[str] = None,
         entry_type: Optional[str] = None,
         tags: Optional[List[str]] = None,
         limit: int = 10,
         source_location: str = "project"
     ) -> List[Dict[str, Any]]:
-        """Search a directory for matching entries with improved multi-term search."""
+        """
+        Search a directory for matching entries with improved multi-term search.
+        
+        query_terms come from _parse_search_query() and must be non-empty.
+        """
         results = []
         
         if not base_dir.exists():
             return results
         
-        # Parse query into normalized terms
-        query_terms = self._parse_search_query(query)
-        if not query_terms:
-            return results
+        entry_filter = _make_entry_filter(entry_type, tags)
+        
+        if self.use_index:
+            with self._index_lock:
+                index = self._open_index(base_dir, category)
+                if index is not None:
+                    candidates = index.search(query_terms, category, entry_type)
+            
+            if index is not None:
+                for entry_data in candidates:
+                    try:
+                        result = self._match_entry(
+                            entry_data,
+                            Path(entry_data["path"]),
+                            base_dir,
+                            query_terms,
+                            entry_filter,
+                            source_location
+                        )
+                    except Exception:
+                        # Skip entries with malformed frontmatter, as the scan does
+                        continue
+                    if result:
+                        results.append(result)
+                return results
         
         # Determine search scope
-        if category:
-            cat_dir = base_dir / category
-            if cat_dir.exists():
-                search_paths = list(cat_dir.rglob("*.md"))
-            else:
-                search_paths = []
+        root = base_dir / category if category else base_dir
+        search_paths = [Path(entry.path) for entry in _walk_md(str(root))]
+        
+        # Reading files releases the GIL, so larger scans parse in a pool
+        if len(search_paths) >= _PARALLEL_PARSE_MIN_FILES:
+            with ThreadPoolExecutor(max_workers=_PARSE_WORKERS) as pool:
+                parsed = list(pool.map(_parse_or_none, search_paths))
         else:
-            search_paths = list(base_dir.rglob("*.md"))
-            
-        for file_path in search_paths:
+            parsed = map(_parse_or_none, search_paths)
+        
+        for file_path, entry_data in zip(search_paths, parsed):
+            if entry_data is None:
+                continue
             try:
-                entry_data = parse_knowledge_file(file_path)
-                
-                # Filter by entry_type
-                if entry_type and entry_data.get("entry_type") != entry_type:
-                    continue
-                
-                # Filter by tags
-                if tags:
-                    entry_tags = entry_data.get("tags", [])
-                    if not any(tag in entry_tags for tag in tags):
-                        continue
-                
-                title = entry_data.get("title", "")
-                content = entry_data.get("content", "")
-                entry_category = entry_data.get("category")
-                entry_tags = entry_data.get("tags", [])
-                
-                # CRITICAL: Multi-term matching - ensure ALL terms appear
-                title_content = f"{title} {content}".lower()
-                if not all(term in title_content for term in query_terms):
-                    continue  # Skip if not all terms match
-                
-                # Calculate relevance score
-                relevance_score = self._calculate_relevance_score(
+                result = self._match_entry(
+                    entry_data,
+                    file_path,
+                    base_dir,
                     query_terms,
-                    title,
-                    content,
-                    entry_category,
-                    entry_tags
+                    entry_filter,
+                    source_location
                 )
-                
-                if relevance_score > 0:
-                    # Extract snippet
-                    snippet = self._extract_snippet(content, query_terms)
-                    
-                    # Get category path relative to base_dir
-                    rel_path = file_path.parent.relative_to(base_dir)
-                    category_path = str(rel_path).replace('\\', '/')
-                    
-                    results.append({
-                        "zettel_id": entry_data.get("zettel_id"),
-                        "title": title,
-                        "entry_type": entry_data.get("entry_type"),
-                        "category": category_path,  # Include category path
-                        "tags": entry_tags,
-                        "source_location": source_location,
-                        "relevance_score": relevance_score / 100.0,  # Normalize to 0-1 range
-                        "snippet": snippet
-                    })
             except Exception:
-                # Skip files that can't be parsed
                 continue
+            if result:
+                results.append(result)
         
         return results
     
-    def _extract_snippet(self, content: str, query_terms: List[str], max_length: int = 150) -> str:
-        """Extract a snippet around query terms."""
-        content_lower = content.lower()
+    def _open_index(self, base_dir: Path, category: Optional[str] = None):
+        """
+        Sync and return the search index for base_dir (call with _index_lock held).
+        
+        The index stays open on the resolver, so repeated searches only pay
+        for the sync (a stat per file), not for reconnecting. With a category,
+        only that subtree is synced. Returns None when
+        the index can't be used (e.g. SQLite built without FTS5, unwritable
+        cache directory), in which case callers scan files directly.
+        """
+        from .index import KnowledgeIndex
+        
+        index = self._indexes.pop(base_dir, None)
+        if index is None:
+            try:
+                index = KnowledgeIndex(base_dir)
+            except (sqlite3.Error, OSError):
+                return None
+        
+        try:
+            index.sync(category)
+        except sqlite3.Error:
+            index.close()
+            return None
+        
+        # Most recently used last; close the oldest beyond the limit
+        self._indexes[base_dir] = index
+        while len(self._indexes) > _MAX_OPEN_INDEXES:
+            self._indexes.pop(next(iter(self._indexes))).close()
+        return index
+    
+    def _match_entry(
+        self,
+        entry_data: Dict[str, Any],
+        file_path: Path,
+        base_dir: Path,
+        query_terms: List[str],
+        entry_filter: Callable[[Dict[str, Any]], bool],
+        source_location: str
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Filter and score one parsed entry, returning a search result or None.
+        
+        entry_filter comes from _make_entry_filter() for the search's filters.
+        """
+        if not entry_filter(entry_data):
+            return None
+        
+        title = entry_data.get("title", "")
+        content = entry_data.get("content", "")
+        entry_category = entry_data.get("category")
+        entry_tags = entry_data.get("tags", [])
+        
+        # One pass per field: feeds the gate, the scorer and the snippet
+        title_hits, _ = self._scan(title.lower(), query_terms)
+        content_hits, first_hit = self._scan(content.lower(), query_terms)
+        
+        # CRITICAL: Multi-term matching - ensure ALL terms appear
+        if not all(title_hits[t] != -1 or content_hits[t] != -1 for t in query_terms):
+            return None  # Skip if not all terms match
+        
+        # Calculate relevance score
+        relevance_score = self._calculate_relevance_score(
+            query_terms,
+            title,
+            content,
+            entry_category,
+            entry_tags,
+            title_hits=title_hits,
+            content_hits=content_hits
+        )
         
-        # Find first occurrence of any query term
+        if relevance_score <= 0:
+            return None
+        
+        # Extract snippet
+        snippet = self._extract_snippet(content, query_terms, first_hit=first_hit)
+        
+        # Get category path relative to base_dir
+        rel_path = file_path.parent.relative_to(base_dir)
+        category_path = str(rel_path).replace('\\', '/')
+        
+        return {
+            "zettel_id": entry_data.get("zettel_id"),
+            "title": title,
+            "entry_type": entry_data.get("entry_type"),
+            "category": category_path,  # Include category path
+            "tags": copy.copy(entry_tags),  # entry_data may be the cached parse
+            "source_location": source_location,
+            "relevance_score": relevance_score / 100.0,  # Normalize to 0-1 range
+            "snippet": snippet
+        }
+    
+    def _scan(self, text_lower: str, query_terms: List[str]) -> Tuple[Dict[str, int], Optional[Tuple[int, int]]]:
+        """
+        Locate each query term in already-lowercased text with a single find per term.
+        
+        Returns:
+            (hits, first_hit) where hits maps term -> first index (-1 if absent)
+            and first_hit is (index, term_length) of the earliest hit, or None
+        """
+        hits = {}
+        first_hit = None
         for term in query_terms:
-            idx = content_lower.find(term)
-            if idx != -1:
-                start = max(0, idx - 50)
-                end = min(len(content), idx + len(term) + 100)
-                snippet = content[start:end]
-                if start > 0:
-                    snippet = "..." + snippet
-                if end < len(content):
-                    snippet = snippet + "..."
-                return snippet.strip()
+            idx = text_lower.find(term)
+            hits[term] = idx
+            if idx != -1 and (first_hit is None or idx < first_hit[0]):
+                first_hit = (idx, len(term))
+        return hits, first_hit
+    
+    def _extract_snippet(
+        self,
+        content: str,
+        query_terms: List[str],
+        max_length: int = 150,
+        first_hit: Optional[Tuple[int, int]] = None
+    ) -> str:
+        """
+        Extract a snippet around query terms.
+        
+        first_hit is the (index, term_length) from _scan(); when omitted the
+        content is scanned here.
+        """
+        if first_hit is None:
+            _, first_hit = self._scan(content.lower(), query_terms)
+        
+        if first_hit is not None:
+            idx, term_length = first_hit
+            start = max(0, idx - 50)
+            end = min(len(content), idx + term_length + 100)
+            snippet = content[start:end]
+            if start > 0:
+                snippet = "..." + snippet
+            if end < len(content):
+                snippet = snippet + "..."
+            return snippet.strip()
         
         # Fallback: first max_length characters
         return content[:max_length] + "..." if len(content) > max_length else content
 
 
-def parse_knowledge_file(file_path: Path) -> Dict[str, Any]:
+def _accept_all(entry_data: Dict[str, Any]) -> bool:
+    return True
+
+
+def _make_entry_filter(
+    entry_type: Optional[str],
+    tags: Optional[List[str]]
+) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Build the entry_type/tags predicate for one search.
+    
+    Only the filters actually given are checked, and the tag list is turned
+    into a set once rather than per entry. An entry passes the tags filter if
+    it has any of the given tags.
+    """
+    if tags:
+        wanted_tags = frozenset(tags)
+        if entry_type:
+            return lambda e: (
+                e.get("entry_type") == entry_type
+                and not wanted_tags.isdisjoint(e.get("tags", []))
+            )
+        return lambda e: not wanted_tags.isdisjoint(e.get("tags", []))
+    if entry_type:
+        return lambda e: e.get("entry_type") == entry_type
+    return _accept_all
+
+
+# discover_categories() results per base dir, with the mtime of every
+# directory walked
+_category_cache: Dict[str, Tuple[Dict[str, int], List[str]]] = {}
+
+
+def _scan_dirs(path: str, base: str, dir_mtimes: Dict[str, int], categories: List[str]):
+    """Collect category paths under path, recording each directory's mtime."""
+    # Stat before listing, so a change made during the listing is seen next time
+    dir_mtimes[path] = os.stat(path).st_mtime_ns
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            if not entry.name.startswith('.'):
+                categories.append(os.path.relpath(entry.path, base).replace('\\', '/'))
+            if not entry.is_symlink():
+                _scan_dirs(entry.path, base, dir_mtimes, categories)
+
+
+def _walk_md(root: str) -> Iterator[os.DirEntry]:
+    """
+    Yield the knowledge files (*.md) under root, recursively.
+    
+    Uses os.scandir, so directories are told apart from files without a stat
+    per entry. Hidden files (editor lock/backup files) aren't entries and are
+    skipped. Symlinked directories aren't followed, as with Path.rglob().
+    A missing root yields nothing.
+    """
+    try:
+        entries = os.scandir(root)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_md(entry.path)
+            elif entry.name.endswith(".md") and not entry.name.startswith("."):
+                yield entry
+
+
+def _dir_mtimes_unchanged(dir_mtimes: Dict[str, int]) -> bool:
+    """Check that every directory still has the recorded mtime."""
+    for path, mtime_ns in dir_mtimes.items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime_ns:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """Stat a path, returning None if it doesn't exist."""
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def parse_knowledge_file(
+    file_path: Path,
+    st: Optional[os.stat_result] = None
+) -> Dict[str, Any]:
     """
     Parse markdown file with YAML frontmatter.
     
+    Parses are cached per (path, inode, mtime_ns, ctime_ns, size), so
+    re-reading an unchanged file skips the YAML parse. Each call returns its
+    own copy.
+    
+    Args:
+        file_path: Path to the knowledge file
+        st: Stat result for file_path if the caller already has one
+    
     Returns:
         Dictionary with frontmatter fields + "content" key
     """
+    return copy.deepcopy(_parse_shared(file_path, st))
+
+
+def _parse_shared(
+    file_path: Path,
+    st: Optional[os.stat_result] = None
+) -> Dict[str, Any]:
+    """
+    parse_knowledge_file() without the copy, for read-only callers.
+    
+    The returned dict is shared with the cache and must not be modified.
+    """
+    if st is None:
+        st = file_path.stat()
+    return _parse_cached(
+        str(file_path), st.st_ino, st.st_mtime_ns, st.st_ctime_ns, st.st_size
+    )
+
+
+def _parse_or_none(file_path: Path) -> Optional[Dict[str, Any]]:
+    """_parse_shared(), returning None for files that can't be parsed."""
+    try:
+        return _parse_shared(file_path)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_cached(
+    path: str,
+    ino: int,
+    mtime_ns: int,
+    ctime_ns: int,
+    size: int
+) -> Dict[str, Any]:
+    """
+    Parse a knowledge file; the stat fields only key the cache.
+    
+    ctime_ns and ino catch same-size rewrites that restore the old mtime
+    (e.g. editors or tools that preserve timestamps).
+    """
+    file_path = Path(path)
     content = file_path.read_text(encoding="utf-8")
     
     # Split frontmatter and content
@@ -383,7 +700,7 @@ def parse_knowledge_file(file_path: Path) -> Dict[str, Any]:
             body = parts[2].strip()
             
             try:
-                frontmatter = yaml.safe_load(frontmatter_str) or {}
+                frontmatter = yaml.load(frontmatter_str, Loader=_YamlLoader) or {}
             except yaml.YAMLError:
                 frontmatter = {}
         else:
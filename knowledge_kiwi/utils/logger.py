@@ -1,11 +1,19 @@
 """
 Logger
 Structured logging for Knowledge Kiwi MCP Server.
+
+Pass format arguments instead of pre-formatting messages so nothing is
+formatted when the level is disabled:
+
+    log.debug("parsed %d files in %s", count, path)
+
+For payloads that are expensive to build, gate on isEnabledFor() or use
+debug_lazy().
 """
 
 import logging
 import sys
-from typing import Optional
+from typing import Callable, Optional, Tuple
 
 
 class Logger:
@@ -25,19 +33,28 @@ class Logger:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
     
-    def debug(self, message: str, extra: Optional[dict] = None):
-        self.logger.debug(message, extra=extra)
+    def debug(self, message: str, *args, extra: Optional[dict] = None):
+        self.logger.debug(message, *args, extra=extra)
     
-    def info(self, message: str, extra: Optional[dict] = None):
-        self.logger.info(message, extra=extra)
+    def info(self, message: str, *args, extra: Optional[dict] = None):
+        self.logger.info(message, *args, extra=extra)
     
-    def warning(self, message: str, extra: Optional[dict] = None):
-        self.logger.warning(message, extra=extra)
+    def warning(self, message: str, *args, extra: Optional[dict] = None):
+        self.logger.warning(message, *args, extra=extra)
     
-    def error(self, message: str, extra: Optional[dict] = None):
-        self.logger.error(message, extra=extra)
+    def error(self, message: str, *args, extra: Optional[dict] = None):
+        self.logger.error(message, *args, extra=extra)
+    
+    def debug_lazy(self, build: Callable[[], Tuple[str, Optional[dict]]]):
+        """
+        Log at DEBUG with a payload that is only built if DEBUG is enabled.
+        
+        build() returns (message, extra), e.g.
+        log.debug_lazy(lambda: ("parsed entry", {"zettel_id": zid, "tags": tags}))
+        """
+        if self.logger.isEnabledFor(logging.DEBUG):
+            message, extra = build()
+            self.logger.debug(message, extra=extra)
     
     def isEnabledFor(self, level: int) -> bool:
         return self.logger.isEnabledFor(level)
-
-
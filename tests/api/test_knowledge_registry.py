@@ -5,7 +5,7 @@ Tests for KnowledgeRegistry API client.
 import pytest
 from unittest.mock import Mock, patch, AsyncMock
 
-from knowledge_kiwi.api.knowledge_registry import KnowledgeRegistry
+from knowledge_kiwi.api.knowledge_registry import KnowledgeRegistry, _get_client
 
 
 class TestKnowledgeRegistry:
@@ -47,6 +47,23 @@ class TestKnowledgeRegistry:
         
         assert results == []
 
+    @pytest.mark.unit
+    def test_client_shared_between_registries(self, monkeypatch):
+        """Test that registries with the same credentials share one client."""
+        monkeypatch.setenv("SUPABASE_URL", "https://example.supabase.co")
+        monkeypatch.setenv("SUPABASE_SECRET_KEY", "secret")
+        _get_client.cache_clear()
+        try:
+            with patch('knowledge_kiwi.api.knowledge_registry.create_client',
+                       side_effect=lambda url, key: Mock()) as create:
+                first = KnowledgeRegistry().client
+                second = KnowledgeRegistry().client
+        finally:
+            _get_client.cache_clear()
+        
+        assert first is second
+        create.assert_called_once_with("https://example.supabase.co", "secret")
+
     @pytest.mark.asyncio
     @pytest.mark.unit
     async def test_get_entry_success(self, mock_supabase):
@@ -5,133 +5,195 @@ Centralized mocking infrastructure to eliminate duplication across test files.
 Provides reusable fixtures and helper classes for mocking Supabase and file system operations.
 """
 
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 import pytest
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from typing import Dict, Any, Optional, List
-import tempfile
-import shutil
+import weakref
+from collections import defaultdict, deque
+from collections.abc import Mapping
+from types import SimpleNamespace
+
+try:
+    import uvloop
+except ImportError:  # Not installed, or Windows
+    uvloop = None
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
 
+from knowledge_kiwi.utils.index import CACHE_DIR_ENV
+from .helpers import link_or_copy, populate_knowledge
+
+
+# tmpfs basetemp created by pytest_configure, removed by pytest_unconfigure
+_SHM_BASETEMP_KEY = pytest.StashKey[str]()
+
+
+def pytest_configure(config):
+    """
+    Put pytest's temp dirs on tmpfs (/dev/shm) when available.
+    
+    Only applies when --basetemp isn't given (xdist workers inherit theirs).
+    Each run gets its own directory, so overlapping runs never clear each
+    other's; it is removed again when the run ends.
+    """
+    if config.option.basetemp is not None:
+        return
+    shm = Path("/dev/shm")
+    if shm.is_dir() and os.access(shm, os.W_OK):
+        basetemp = tempfile.mkdtemp(prefix="knowledge-kiwi-tests-", dir=shm)
+        config.stash[_SHM_BASETEMP_KEY] = basetemp
+        config.option.basetemp = basetemp
+
+
+def pytest_unconfigure(config):
+    """Remove the tmpfs basetemp created by pytest_configure (it lives in RAM)."""
+    basetemp = config.stash.get(_SHM_BASETEMP_KEY, None)
+    if basetemp is not None:
+        shutil.rmtree(basetemp, ignore_errors=True)
+
 
 # ============================================================================
 # Mock Helper Classes
 # ============================================================================
 
+# Recycled query builders; see SupabaseQueryBuilder.acquire/release
+_BUILDER_POOL: deque = deque()
+_LIVE_BUILDERS: "weakref.WeakSet[SupabaseQueryBuilder]" = weakref.WeakSet()
+
+# Query methods that only extend the chain (no state of their own)
+_CHAIN_METHODS = frozenset({"eq", "in_", "limit", "offset", "order", "insert", "update", "delete"})
+
+
 class SupabaseQueryBuilder:
     """
-    Builder pattern for creating Supabase query mocks.
+    Chainable stand-in for a Supabase query.
+    
+    Supports fluent chains like .select().eq().in_().limit().execute().data
+    with plain methods instead of Mock objects. Every chain call is recorded
+    in ``calls`` as (method, args, kwargs) for tests that need to assert on it.
     
-    Creates a fluent query chain that supports methods like:
-    .select().eq().in_().limit().execute().data
+    Table mocks take builders from a pool via acquire(); builders still alive
+    at the end of a test are released back by the _release_query_builders
+    fixture.
     """
     
+    __slots__ = (
+        "data", "_single_data", "_list_data", "_count", "_is_single", "_is_maybe_single",
+        "calls", "__weakref__",
+    )
+    
     def __init__(self, data: Any = None):
         """Initialize query builder with optional default data."""
+        self.calls: List[tuple] = []
+        self._reset(data)
+    
+    def _reset(self, data: Any = None):
+        """Clear query state so the builder can be reused."""
         self.data = data if data is not None else []
+        # The data shape is fixed per query, so resolve both result forms once
+        if isinstance(self.data, list):
+            self._single_data = self.data[0] if self.data else self.data
+            self._list_data = self.data
+        elif isinstance(self.data, Mapping):
+            self._single_data = self.data
+            self._list_data = [self.data]
+        else:
+            self._single_data = self._list_data = self.data
         self._count = None
-        self._query = Mock()
-        self._setup_chain()
-    
-    def _setup_chain(self):
-        """Setup the fluent query chain - all methods return self to allow chaining."""
         self._is_single = False
         self._is_maybe_single = False
+        self.calls.clear()
+    
+    @classmethod
+    def acquire(cls, data: Any = None) -> "SupabaseQueryBuilder":
+        """Take a builder from the pool (or create one) reset to data."""
+        builder = _BUILDER_POOL.pop() if _BUILDER_POOL else cls()
+        builder._reset(data)
+        _LIVE_BUILDERS.add(builder)
+        return builder
+    
+    def release(self):
+        """Return this builder to the pool."""
+        _LIVE_BUILDERS.discard(self)
+        _BUILDER_POOL.append(self)
+    
+    def _chain(self, method: str, args: tuple, kwargs: dict):
+        self.calls.append((method, args, kwargs))
+        return self
+    
+    def __getattr__(self, name: str):
+        # Side-effect-free chain methods are synthesized on first use
+        if name in _CHAIN_METHODS:
+            return lambda *args, **kwargs: self._chain(name, args, kwargs)
+        raise AttributeError(name)
+    
+    def select(self, *args, **kwargs):
+        if 'count' in kwargs:
+            self._count = kwargs['count']
+        return self._chain("select", args, kwargs)
+    
+    def single(self):
+        self._is_single = True
+        return self._chain("single", (), {})
+    
+    def maybe_single(self):
+        self._is_maybe_single = True
+        return self._chain("maybe_single", (), {})
+    
+    def execute(self):
+        """Return a response object with data (and count for count='exact')."""
+        self.calls.append(("execute", (), {}))
+        if self._is_single or self._is_maybe_single:
+            data = self._single_data
+        else:
+            data = self._list_data
         
-        # All query builder methods return self to allow chaining
-        self._query.eq = Mock(return_value=self._query)
-        self._query.in_ = Mock(return_value=self._query)
-        self._query.limit = Mock(return_value=self._query)
-        self._query.offset = Mock(return_value=self._query)
-        self._query.order = Mock(return_value=self._query)
-        
-        # Track single() calls
-        def single_side_effect():
-            self._is_single = True
-            return self._query
-        self._query.single = Mock(side_effect=single_side_effect)
-        
-        def maybe_single_side_effect():
-            self._is_maybe_single = True
-            return self._query
-        self._query.maybe_single = Mock(side_effect=maybe_single_side_effect)
-        
-        # select() is handled by select_side_effect
-        def select_side_effect(*args, **kwargs):
-            if 'count' in kwargs:
-                self._count = kwargs['count']
-            return self._query
-        self._query.select = Mock(side_effect=select_side_effect)
-        
-        self._query.insert = Mock(return_value=self._query)
-        self._query.update = Mock(return_value=self._query)
-        self._query.delete = Mock(return_value=self._query)
-        
-        # Execute returns a response object with data attribute
-        def execute_side_effect():
-            mock_response = Mock()
-            if self._is_single or self._is_maybe_single:
-                if isinstance(self.data, list) and len(self.data) > 0:
-                    mock_response.data = self.data[0]
-                elif isinstance(self.data, dict):
-                    mock_response.data = self.data
-                else:
-                    mock_response.data = self.data
+        count = None
+        if self._count == 'exact':
+            if isinstance(data, list):
+                count = len(data)
             else:
-                if isinstance(self.data, dict):
-                    mock_response.data = [self.data]
-                else:
-                    mock_response.data = self.data if self.data is not None else []
-            
-            if self._count == 'exact':
-                if isinstance(mock_response.data, list):
-                    count_value = len(mock_response.data)
-                else:
-                    count_value = 1 if mock_response.data else 0
-                mock_response.count = count_value
-            
-            return mock_response
+                count = 1 if data else 0
         
-        self._query.execute = Mock(side_effect=execute_side_effect)
+        return SimpleNamespace(data=data, count=count)
     
     def build(self):
-        """Return the configured query mock."""
-        return self._query
+        """Return the chainable query (kept for backward compatibility)."""
+        return self
 
 
 class SupabaseTableMock:
     """Mock for a Supabase table with query builder support."""
     
+    __slots__ = ("default_data",)
+    
     def __init__(self, default_data: Any = None):
         """Initialize table mock with optional default data."""
         self.default_data = default_data if default_data is not None else []
     
     def select(self, *args, **kwargs):
         """Mock select() - returns a query builder with current default_data."""
-        builder = SupabaseQueryBuilder(self.default_data)
-        if 'count' in kwargs:
-            builder._count = kwargs['count']
-        return builder.build()
+        return SupabaseQueryBuilder.acquire(self.default_data).select(*args, **kwargs)
     
     def insert(self, *args, **kwargs):
         """Mock insert() - returns a query builder."""
-        return SupabaseQueryBuilder().build()
+        return SupabaseQueryBuilder.acquire().insert(*args, **kwargs)
     
     def update(self, *args, **kwargs):
         """Mock update() - returns a query builder."""
-        builder = SupabaseQueryBuilder()
-        query = builder.build()
-        query.execute = Mock(return_value=Mock(data=[]))
-        return query
+        return SupabaseQueryBuilder.acquire().update(*args, **kwargs)
     
     def delete(self, *args, **kwargs):
         """Mock delete() - returns a query builder."""
-        return SupabaseQueryBuilder().build()
+        return SupabaseQueryBuilder.acquire().delete(*args, **kwargs)
 
 
 class MockSupabaseClient:
@@ -145,150 +207,220 @@ class MockSupabaseClient:
     - RPC support for search_knowledge_fulltext
     """
     
+    __slots__ = ("_tables", "table", "rpc", "_rpc_search_query")
+    
     def __init__(self):
         """Initialize mock Supabase client with knowledge tables."""
-        self._tables = {
-            'knowledge_entries': SupabaseTableMock(),
-            'knowledge_relationships': SupabaseTableMock(),
-            'knowledge_collections': SupabaseTableMock(),
-        }
+        # Tables (knowledge_entries etc.) are created empty on first access
+        self._tables: Dict[str, SupabaseTableMock] = defaultdict(SupabaseTableMock)
         
-        # Setup table() method for direct table access
-        def table_side_effect(table_name: str):
-            """Return table mock for given table name."""
-            if table_name in self._tables:
-                return self._tables[table_name]
-            new_table = SupabaseTableMock()
-            self._tables[table_name] = new_table
-            return new_table
-        
-        self.table = Mock(side_effect=table_side_effect)
+        # table() is a plain lookup into _tables
+        self.table = self._tables.__getitem__
         
         # Setup RPC for search_knowledge_fulltext
         self.rpc = Mock()
+        self._rpc_search_query = None
+    
+    def _rpc(self, function_name, *args, **kwargs):
+        """Route search_knowledge_fulltext to the configured query."""
+        if function_name == 'search_knowledge_fulltext':
+            return self._rpc_search_query
+        return SupabaseQueryBuilder()
     
     def configure_table_data(self, table_name: str, data: Any):
         """Configure default data for a table."""
-        if table_name in self._tables:
-            self._tables[table_name].default_data = data
-        else:
-            self._tables[table_name] = SupabaseTableMock(data)
+        self._tables[table_name].default_data = data
     
     def setup_rpc_search(self, query: str, return_data: List[Dict[str, Any]]):
         """Setup RPC search_knowledge_fulltext to return specific data."""
-        mock_response = Mock()
-        mock_response.data = return_data
-        mock_response.execute = Mock(return_value=mock_response)
+        # RPC returns a query whose execute() yields return_data as a list
+        self._rpc_search_query = SupabaseQueryBuilder(return_data)
         
-        # RPC returns a query builder that has execute()
-        mock_rpc_query = Mock()
-        mock_rpc_query.execute = Mock(return_value=mock_response)
-        
-        def rpc_side_effect(function_name, *args, **kwargs):
-            if function_name == 'search_knowledge_fulltext':
-                return mock_rpc_query
-            return Mock(execute=Mock(return_value=Mock(data=[])))
-        
-        self.rpc = Mock(side_effect=rpc_side_effect)
+        self.rpc.side_effect = self._rpc
+    
+    def reset(self):
+        """Clear configured table data and RPC setup between tests (in place)."""
+        self._tables.clear()
+        self.rpc.reset_mock(return_value=True, side_effect=True)
+        self._rpc_search_query = None
 
 
 # ============================================================================
 # Base Fixtures
 # ============================================================================
 
-@pytest.fixture
+if uvloop is not None:
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run async tests on uvloop (only defined when uvloop is installed)."""
+        return uvloop.EventLoopPolicy()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _index_cache_dir(tmp_path_factory):
+    """Keep search indexes built by tests out of the real user cache dir."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("index-cache")))
+    yield
+    mp.undo()
+
+
+@pytest.fixture(autouse=True)
+def _release_query_builders():
+    """Return every query builder handed out during the test to the pool."""
+    yield
+    for builder in list(_LIVE_BUILDERS):
+        builder.release()
+
+
+@pytest.fixture(scope="session")
 def mock_supabase():
     """
     Standard Supabase client mock.
     
     Returns a MockSupabaseClient instance with knowledge tables pre-configured.
+    Shared per session; _reset_mock_supabase clears it after each test.
     """
     return MockSupabaseClient()
 
 
+@pytest.fixture(autouse=True)
+def _reset_mock_supabase(request):
+    """Reset the shared mock_supabase after tests that used it."""
+    yield
+    if "mock_supabase" in request.fixturenames:
+        request.getfixturevalue("mock_supabase").reset()
+
+
 @pytest.fixture
-def temp_project_dir():
+def temp_project_dir(tmp_path_factory):
     """
     Create a temporary directory for testing project knowledge storage.
     
-    Yields a Path to the temp directory and cleans up after.
+    Built on pytest's tmp_path_factory, which owns cleanup. This is a real
+    directory rather than a pyfakefs one: the search index is SQLite (which
+    bypasses Python's file APIs) and nested_knowledge_project hardlinks its
+    files from a session-wide template. pytest_configure already puts it on
+    tmpfs.
     """
-    temp_dir = Path(tempfile.mkdtemp())
-    try:
-        yield temp_dir
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    return tmp_path_factory.mktemp("project")
 
 
 @pytest.fixture
-def temp_user_dir():
+def temp_user_dir(tmp_path_factory):
     """
     Create a temporary directory for testing user knowledge storage.
     
-    Yields a Path to the temp directory and cleans up after.
+    Built on pytest's tmp_path_factory, which owns cleanup.
+    """
+    return tmp_path_factory.mktemp("user")
+
+
+@pytest.fixture(scope="session")
+def empty_dir(tmp_path_factory):
+    """
+    Path to a knowledge directory that does not exist.
+    
+    One path per session, under the session's base temp dir rather than a
+    fixed /tmp path, so parallel workers never share it. Tests must not
+    create anything there.
     """
-    temp_dir = Path(tempfile.mkdtemp())
-    try:
-        yield temp_dir
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    return tmp_path_factory.getbasetemp() / "empty"
+
+
+# The sample entry is fixed, so its file content is serialized once at import
+_SAMPLE_ENTRY = {
+    "zettel_id": "042-test-entry",
+    "title": "Test Knowledge Entry",
+    "content": "# Test Entry\n\nThis is test content for knowledge entries.",
+    "entry_type": "pattern",
+    "tags": ["test", "example"],
+    "source_type": "manual",
+    "source_url": None,
+    "version": "1.0.0"
+}
+
+# Plain "key: value" lines are valid YAML for this fixed entry (no values need
+# quoting), so the frontmatter is emitted by hand rather than via yaml.dump
+_SAMPLE_FRONTMATTER_YAML = "\n".join(
+    [
+        f"zettel_id: {_SAMPLE_ENTRY['zettel_id']}",
+        f"title: {_SAMPLE_ENTRY['title']}",
+        f"entry_type: {_SAMPLE_ENTRY['entry_type']}",
+        "tags:",
+    ]
+    + [f"  - {tag}" for tag in _SAMPLE_ENTRY["tags"]]
+    + [f"source_type: {_SAMPLE_ENTRY['source_type']}"]
+) + "\n"
+_SAMPLE_FILE_CONTENT = (
+    f"---\n{_SAMPLE_FRONTMATTER_YAML}---\n\n{_SAMPLE_ENTRY['content']}\n"
+).encode("utf-8")
+
+# Where the sample file lives relative to the project root (category is the
+# pluralized entry_type)
+_SAMPLE_REL_DIR = Path(".ai") / "knowledge" / "patterns"
+_SAMPLE_FILENAME = f"{_SAMPLE_ENTRY['zettel_id']}.md"
 
 
 @pytest.fixture
 def sample_knowledge_entry():
     """Sample knowledge entry data for testing."""
-    return {
-        "zettel_id": "042-test-entry",
-        "title": "Test Knowledge Entry",
-        "content": "# Test Entry\n\nThis is test content for knowledge entries.",
-        "entry_type": "pattern",
-        "tags": ["test", "example"],
-        "source_type": "manual",
-        "source_url": None,
-        "version": "1.0.0"
-    }
+    return {**_SAMPLE_ENTRY, "tags": list(_SAMPLE_ENTRY["tags"])}
 
 
 @pytest.fixture
-def sample_knowledge_file(temp_project_dir, sample_knowledge_entry):
+def sample_knowledge_file(temp_project_dir):
     """
     Create a sample knowledge entry file in temp directory.
     
     Returns the path to the created file.
     """
-    import yaml
-    from pathlib import Path
-    
-    entry_type = sample_knowledge_entry["entry_type"]
-    zettel_id = sample_knowledge_entry["zettel_id"]
-    
-    # Create directory structure (pluralize entry_type for category)
-    category = entry_type + "s" if not entry_type.endswith("s") else entry_type
-    knowledge_dir = temp_project_dir / ".ai" / "knowledge" / category
+    knowledge_dir = temp_project_dir / _SAMPLE_REL_DIR
     knowledge_dir.mkdir(parents=True, exist_ok=True)
     
-    # Create file
-    file_path = knowledge_dir / f"{zettel_id}.md"
-    
-    # Build frontmatter
-    frontmatter = {
-        "zettel_id": zettel_id,
-        "title": sample_knowledge_entry["title"],
-        "entry_type": entry_type,
-        "tags": sample_knowledge_entry["tags"],
-    }
-    
-    if sample_knowledge_entry.get("source_type"):
-        frontmatter["source_type"] = sample_knowledge_entry["source_type"]
-    
-    if sample_knowledge_entry.get("source_url"):
-        frontmatter["source_url"] = sample_knowledge_entry["source_url"]
-    
-    # Write file
-    frontmatter_yaml = yaml.dump(frontmatter, default_flow_style=False, sort_keys=False)
-    file_content = f"---\n{frontmatter_yaml}---\n\n{sample_knowledge_entry['content']}\n"
-    
-    file_path.write_text(file_content, encoding="utf-8")
+    file_path = knowledge_dir / _SAMPLE_FILENAME
+    file_path.write_bytes(_SAMPLE_FILE_CONTENT)
     
     return file_path
 
+
+@pytest.fixture(scope="session")
+def knowledge_template(tmp_path_factory):
+    """
+    Project tree with the canonical nested-category entries, written once.
+    
+    Contains .ai/knowledge/email-infrastructure/smtp/048-nested.md and
+    .ai/knowledge/email-infrastructure/smtp/001-spf.md.
+    """
+    root = tmp_path_factory.mktemp("knowledge-template")
+    populate_knowledge(root / ".ai" / "knowledge", [
+        {
+            "zettel_id": "048-nested",
+            "title": "Nested Entry",
+            "content": "# Nested\n\nContent",
+            "entry_type": "pattern",
+            "category": "email-infrastructure/smtp"
+        },
+        {
+            "zettel_id": "001-spf",
+            "title": "SPF Records",
+            "content": "# SPF Records\n\nSPF configuration",
+            "entry_type": "pattern",
+            "category": "email-infrastructure/smtp"
+        },
+    ])
+    return root
+
+
+@pytest.fixture
+def nested_knowledge_project(temp_project_dir, knowledge_template):
+    """
+    temp_project_dir populated from knowledge_template.
+    
+    Files are hardlinked, so tests using this fixture must not modify them.
+    """
+    shutil.copytree(
+        knowledge_template, temp_project_dir,
+        copy_function=link_or_copy, dirs_exist_ok=True
+    )
+    return temp_project_dir
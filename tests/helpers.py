@@ -0,0 +1,106 @@
+"""
+Plain helpers shared by the test modules.
+
+Fixtures live in the conftest modules; anything tests import directly lives
+here, since conftest modules are not meant to be imported.
+"""
+
+import contextlib
+import os
+import shutil
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator
+
+from knowledge_kiwi.utils.jsonio import loads as json_loads
+from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
+
+__all__ = [
+    "REGISTRY_ENTRY",
+    "expect_err",
+    "expect_ok",
+    "json_loads",
+    "link_or_copy",
+    "populate_knowledge",
+    "setattr_ctx",
+]
+
+
+# Registry row for the sample entry (042-test-entry). Read-only template;
+# copy it (dict(REGISTRY_ENTRY)) before handing it to a mock
+REGISTRY_ENTRY = MappingProxyType({
+    "zettel_id": "042-test-entry",
+    "title": "Test Entry",
+    "content": "Content",
+    "entry_type": "pattern",
+    "tags": []
+})
+
+
+@contextlib.contextmanager
+def setattr_ctx(obj: Any, attr: str, value: Any) -> Iterator[None]:
+    """Set obj.attr to value for the duration of the block, then restore it."""
+    old = getattr(obj, attr)
+    setattr(obj, attr, value)
+    try:
+        yield
+    finally:
+        setattr(obj, attr, old)
+
+
+def expect_ok(result: str, action: str, **fields: Any) -> Dict[str, Any]:
+    """
+    Parse a tool result and assert it succeeded for the given action.
+    
+    Args:
+        result: JSON string returned by a tool's execute()
+        action: Expected "action" field
+        **fields: Other fields that must equal the given values
+    
+    Returns:
+        The parsed result
+    """
+    data = json_loads(result)
+    assert data["status"] == "success", data
+    assert data["action"] == action
+    for key, value in fields.items():
+        assert data[key] == value, key
+    return data
+
+
+def expect_err(result: str, *fragments: str) -> Dict[str, Any]:
+    """
+    Parse a tool result and assert it is an error mentioning each fragment.
+    
+    Fragments are matched case-insensitively against the "error" message.
+    
+    Returns:
+        The parsed result
+    """
+    data = json_loads(result)
+    assert "error" in data, data
+    message = data["error"].lower()
+    for fragment in fragments:
+        assert fragment in message, message
+    return data
+
+
+def populate_knowledge(root, entries: Iterable[Dict[str, Any]]) -> None:
+    """
+    Write knowledge entries under a knowledge directory.
+    
+    Each entry holds write_knowledge_file() keyword arguments (without
+    file_path) and is written to root/<category>/<zettel_id>.md. Entries
+    without a category go under the pluralized entry_type, as ManageTool does.
+    write_knowledge_file() creates the directories.
+    """
+    for entry in entries:
+        directory = entry.get("category") or f"{entry['entry_type']}s"
+        write_knowledge_file(file_path=root / directory / f"{entry['zettel_id']}.md", **entry)
+
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, copying instead where links are unsupported."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
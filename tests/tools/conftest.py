@@ -0,0 +1,123 @@
+"""
+Shared fixtures for MCP tool tests.
+
+Tool instances hold no per-call state, so one of each is built per session.
+Tests that need different dependencies patch them with context managers
+(reverted at test exit) or construct their own tool. Session tools that
+touch the filesystem are rooted in session temp dirs, never the real cwd or
+home directory.
+"""
+
+import pytest
+
+from knowledge_kiwi.api.knowledge_registry import KnowledgeRegistry
+from knowledge_kiwi.tools.get import GetTool
+from knowledge_kiwi.tools.help import HelpTool
+from knowledge_kiwi.tools.link import LinkTool
+from knowledge_kiwi.tools.manage import ManageTool
+from knowledge_kiwi.tools.search import SearchTool
+from knowledge_kiwi.utils.knowledge_resolver import KnowledgeResolver
+
+from ..helpers import REGISTRY_ENTRY, setattr_ctx
+
+
+def _session_resolver(tmp_path_factory, name: str) -> KnowledgeResolver:
+    """
+    Resolver rooted in a fresh session temp dir instead of the cwd and home.
+    
+    Project knowledge is <tmp>/project/.ai/knowledge and user knowledge is
+    <tmp>/home/.knowledge-kiwi; neither exists until a test creates it.
+    """
+    root = tmp_path_factory.mktemp(name)
+    resolver = KnowledgeResolver(project_root=root / "project")
+    resolver.user_knowledge_dir = root / "home" / ".knowledge-kiwi"
+    return resolver
+
+
+@pytest.fixture(scope="session")
+def get_tool(tmp_path_factory):
+    """Shared GetTool instance; its resolver is closed at session end."""
+    resolver = _session_resolver(tmp_path_factory, "get-tool")
+    yield GetTool(resolver=resolver, home_dir=resolver.user_knowledge_dir.parent)
+    resolver.close()
+
+
+@pytest.fixture
+def registry_get_tool(request, mock_supabase, get_tool):
+    """
+    get_tool with its registry client patched to mock_supabase.
+    
+    Parametrize indirectly with the knowledge_entries table data.
+    """
+    mock_supabase.configure_table_data('knowledge_entries', request.param)
+    with setattr_ctx(get_tool.registry, 'client', mock_supabase):
+        yield get_tool
+
+
+@pytest.fixture
+def registry_with_entry(mock_supabase):
+    """mock_supabase with a copy of REGISTRY_ENTRY in the knowledge_entries table."""
+    mock_supabase.configure_table_data('knowledge_entries', dict(REGISTRY_ENTRY))
+    return mock_supabase
+
+
+@pytest.fixture(scope="session")
+def help_tool():
+    """Shared HelpTool instance."""
+    return HelpTool()
+
+
+@pytest.fixture(scope="session")
+def link_tool():
+    """Shared LinkTool instance."""
+    return LinkTool()
+
+
+@pytest.fixture(scope="session")
+def manage_tool(tmp_path_factory):
+    """Shared ManageTool instance; its resolver is closed at session end."""
+    resolver = _session_resolver(tmp_path_factory, "manage-tool")
+    yield ManageTool(resolver=resolver)
+    resolver.close()
+
+
+@pytest.fixture
+def project_manage_tool(manage_tool, temp_project_dir, empty_dir):
+    """
+    manage_tool with its resolver pointed at temp_project_dir.
+    
+    Project knowledge lives under temp_project_dir/.ai/knowledge and the
+    user knowledge dir is empty. Both are restored at test exit.
+    """
+    resolver = manage_tool.resolver
+    with setattr_ctx(resolver, 'project_knowledge_dir', temp_project_dir / ".ai" / "knowledge"), \
+         setattr_ctx(resolver, 'user_knowledge_dir', empty_dir):
+        yield manage_tool
+
+
+@pytest.fixture
+def make_search_tool():
+    """
+    Factory for SearchTools wired to the given dirs and registry client.
+    
+    make_search_tool(project_knowledge_dir=None, user_knowledge_dir=None, client=None);
+    dirs left as None keep the resolver defaults. Resolvers' search indexes
+    are closed at test exit.
+    """
+    resolvers = []
+    
+    def make(project_knowledge_dir=None, user_knowledge_dir=None, client=None):
+        resolver = KnowledgeResolver()
+        if project_knowledge_dir is not None:
+            resolver.project_knowledge_dir = project_knowledge_dir
+        if user_knowledge_dir is not None:
+            resolver.user_knowledge_dir = user_knowledge_dir
+        registry = KnowledgeRegistry()
+        if client is not None:
+            registry.client = client
+        resolvers.append(resolver)
+        return SearchTool(resolver=resolver, registry=registry)
+    
+    yield make
+    for resolver in resolvers:
+        resolver.close()
@@ -3,9 +3,8 @@ Tests for help tool.
 """
 
 import pytest
-import json
 
-from knowledge_kiwi.tools.help import HelpTool
+from ..helpers import json_loads
 
 
 class TestHelpTool:
@@ -13,87 +12,28 @@ class TestHelpTool:
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_help_create(self):
-        """Test help for creating entries."""
-        tool = HelpTool()
+    @pytest.mark.parametrize("query, topic_words, alt_key, required_keys", [
+        ("how to create a knowledge entry", ("creating", "create"), None, ("workflow", "examples")),
+        ("how to search", ("search",), None, ()),
+        ("how to link entries", ("link",), None, ()),
+        ("how to publish", ("publish",), None, ()),
+        ("what is knowledge kiwi", ("overview",), "tools", ()),
+        ("what is source selection", ("source",), "source_options", ()),
+    ], ids=["create", "search", "link", "publish", "general", "source_selection"])
+    async def test_help_query(self, help_tool, query, topic_words, alt_key, required_keys):
+        """Test that each help query resolves to the matching topic."""
+        result_data = await help_tool._execute_raw({"query": query})
         
-        result = await tool.execute({
-            "query": "how to create a knowledge entry"
-        })
-        
-        result_data = json.loads(result)
-        assert "topic" in result_data
-        assert "workflow" in result_data
-        assert "examples" in result_data
-        assert "Creating" in result_data["topic"] or "create" in result_data["topic"].lower()
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_help_search(self):
-        """Test help for searching."""
-        tool = HelpTool()
-        
-        result = await tool.execute({
-            "query": "how to search"
-        })
-        
-        result_data = json.loads(result)
-        assert "topic" in result_data
-        assert "Searching" in result_data["topic"] or "search" in result_data["topic"].lower()
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_help_link(self):
-        """Test help for linking."""
-        tool = HelpTool()
-        
-        result = await tool.execute({
-            "query": "how to link entries"
-        })
-        
-        result_data = json.loads(result)
-        assert "topic" in result_data
-        assert "Linking" in result_data["topic"] or "link" in result_data["topic"].lower()
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_help_publish(self):
-        """Test help for publishing."""
-        tool = HelpTool()
-        
-        result = await tool.execute({
-            "query": "how to publish"
-        })
-        
-        result_data = json.loads(result)
         assert "topic" in result_data
-        assert "Publishing" in result_data["topic"] or "publish" in result_data["topic"].lower()
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_help_general(self):
-        """Test general help."""
-        tool = HelpTool()
-        
-        result = await tool.execute({
-            "query": "what is knowledge kiwi"
-        })
+        for key in required_keys:
+            assert key in result_data
         
-        result_data = json.loads(result)
-        assert "topic" in result_data
-        assert "tools" in result_data or "overview" in result_data.get("topic", "").lower()
+        topic = result_data["topic"].lower()
+        assert any(word in topic for word in topic_words) or alt_key in result_data
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_help_source_selection(self):
-        """Test help for source selection."""
-        tool = HelpTool()
-        
-        result = await tool.execute({
-            "query": "what is source selection"
-        })
-        
-        result_data = json.loads(result)
-        assert "topic" in result_data
-        assert "source" in result_data["topic"].lower() or "source_options" in result_data
-
+    async def test_execute_returns_json(self, help_tool):
+        """Test that execute() serializes the _execute_raw() result."""
+        params = {"query": "how to search"}
+        assert json_loads(await help_tool.execute(params)) == await help_tool._execute_raw(params)
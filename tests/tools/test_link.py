@@ -3,147 +3,106 @@ Tests for link tool (relationships and collections).
 """
 
 import pytest
-import json
-from unittest.mock import patch, Mock
+import re
 
-from knowledge_kiwi.tools.link import LinkTool
+from ..helpers import json_loads, setattr_ctx
+
+
+# Case-insensitive matchers for error messages
+_REQUIRED_RE = re.compile(r"required", re.IGNORECASE)
+_NAME_RE = re.compile(r"name", re.IGNORECASE)
+_ZETTEL_ID_RE = re.compile(r"zettel_id", re.IGNORECASE)
+_UNKNOWN_ACTION_RE = re.compile(r"unknown action", re.IGNORECASE)
 
 
 class TestLinkTool:
-    """Tests for LinkTool."""
+    """Tests for LinkTool actions against the registry."""
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_link_entries_success(self, mock_supabase):
-        """Test successfully linking two entries."""
-        tool = LinkTool()
-        
-        # Setup mock entries
-        mock_supabase.configure_table_data('knowledge_entries', [
-            {"zettel_id": "042-from"},
-            {"zettel_id": "043-to"}
-        ])
-        
-        with patch.object(tool.registry, 'client', mock_supabase):
-            result = await tool.execute({
+    @pytest.mark.parametrize("table, table_data, payload, expected, expected_paths", [
+        (
+            'knowledge_entries',
+            [{"zettel_id": "042-from"}, {"zettel_id": "043-to"}],
+            {
                 "action": "link",
                 "from_zettel_id": "042-from",
                 "to_zettel_id": "043-to",
                 "relationship_type": "references"
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["status"] == "success"
-            assert result_data["action"] == "link"
-            assert "relationship" in result_data
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_link_entries_missing_ids(self):
-        """Test link with missing zettel IDs."""
-        tool = LinkTool()
-        
-        result = await tool.execute({
-            "action": "link",
-            "from_zettel_id": "042-from"
-            # Missing to_zettel_id
-        })
-        
-        result_data = json.loads(result)
-        assert "error" in result_data
-        assert "required" in result_data["error"].lower()
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_create_collection_success(self, mock_supabase):
-        """Test successfully creating a collection."""
-        tool = LinkTool()
-        
-        with patch.object(tool.registry, 'client', mock_supabase):
-            result = await tool.execute({
+            },
+            {"status": "success", "action": "link"},
+            [("relationship",)]
+        ),
+        (
+            None,
+            None,
+            {
                 "action": "create_collection",
                 "name": "Test Collection",
                 "description": "A test collection",
                 "zettel_ids": ["042-entry1", "043-entry2"],
                 "collection_type": "topic"
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["status"] == "success"
-            assert result_data["action"] == "create_collection"
-            assert "collection_id" in result_data
-
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_create_collection_missing_name(self):
-        """Test create collection with missing name."""
-        tool = LinkTool()
+            },
+            {"status": "success", "action": "create_collection"},
+            [("collection_id",)]
+        ),
+        (
+            'knowledge_relationships',
+            [
+                {
+                    "from_zettel_id": "042-entry",
+                    "to_zettel_id": "043-related",
+                    "relationship_type": "references"
+                },
+                {
+                    "from_zettel_id": "044-backlink",
+                    "to_zettel_id": "042-entry",
+                    "relationship_type": "extends"
+                }
+            ],
+            {"action": "get_relationships", "zettel_id": "042-entry"},
+            {"zettel_id": "042-entry"},
+            [("relationships", "outgoing"), ("relationships", "incoming")]
+        ),
+    ], ids=["link", "create_collection", "get_relationships"])
+    async def test_action_success(self, link_tool, mock_supabase, table, table_data, payload, expected, expected_paths):
+        """Test each link action's success path."""
+        if table:
+            mock_supabase.configure_table_data(table, table_data)
         
-        result = await tool.execute({
-            "action": "create_collection",
-            "zettel_ids": ["042-entry1"]
-        })
+        with setattr_ctx(link_tool.registry, 'client', mock_supabase):
+            result_data = await link_tool._execute_raw(payload)
         
-        result_data = json.loads(result)
-        assert "error" in result_data
-        assert "name" in result_data["error"].lower()
+        for key, value in expected.items():
+            assert result_data[key] == value
+        for path in expected_paths:
+            node = result_data
+            for key in path:
+                assert key in node
+                node = node[key]
 
-    @pytest.mark.asyncio
-    @pytest.mark.unit
-    async def test_get_relationships_success(self, mock_supabase):
-        """Test successfully getting relationships for an entry."""
-        tool = LinkTool()
-        
-        # Setup relationships
-        mock_supabase.configure_table_data('knowledge_relationships', [
-            {
-                "from_zettel_id": "042-entry",
-                "to_zettel_id": "043-related",
-                "relationship_type": "references"
-            },
-            {
-                "from_zettel_id": "044-backlink",
-                "to_zettel_id": "042-entry",
-                "relationship_type": "extends"
-            }
-        ])
-        
-        with patch.object(tool.registry, 'client', mock_supabase):
-            result = await tool.execute({
-                "action": "get_relationships",
-                "zettel_id": "042-entry"
-            })
-            
-            result_data = json.loads(result)
-            assert "relationships" in result_data
-            assert "outgoing" in result_data["relationships"]
-            assert "incoming" in result_data["relationships"]
+
+class TestLinkToolValidation:
+    """Tests for LinkTool argument validation (no registry needed)."""
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_get_relationships_missing_id(self):
-        """Test get relationships with missing zettel_id."""
-        tool = LinkTool()
-        
-        result = await tool.execute({
-            "action": "get_relationships"
-        })
+    @pytest.mark.parametrize("payload, error_re", [
+        ({"action": "link", "from_zettel_id": "042-from"}, _REQUIRED_RE),
+        ({"action": "create_collection", "zettel_ids": ["042-entry1"]}, _NAME_RE),
+        ({"action": "get_relationships"}, _ZETTEL_ID_RE),
+        ({"action": "invalid"}, _UNKNOWN_ACTION_RE),
+    ], ids=["link_missing_ids", "create_collection_missing_name", "get_relationships_missing_id", "invalid_action"])
+    async def test_invalid_arguments(self, link_tool, payload, error_re):
+        """Test that invalid arguments return an explanatory error."""
+        result_data = await link_tool._execute_raw(payload)
         
-        result_data = json.loads(result)
         assert "error" in result_data
-        assert "zettel_id" in result_data["error"].lower()
+        assert error_re.search(result_data["error"])
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_invalid_action(self):
-        """Test with invalid action."""
-        tool = LinkTool()
-        
-        result = await tool.execute({
-            "action": "invalid"
-        })
-        
-        result_data = json.loads(result)
-        assert "error" in result_data
-        assert "unknown action" in result_data["error"].lower()
-
+    async def test_execute_returns_json(self, link_tool):
+        """Test that execute() serializes the _execute_raw() result."""
+        arguments = {"action": "invalid_action"}
+        assert json_loads(await link_tool.execute(arguments)) == await link_tool._execute_raw(arguments)
@@ -3,11 +3,9 @@ Tests for search tool.
 """
 
 import pytest
-import json
-from unittest.mock import patch, Mock
-from pathlib import Path
 
-from knowledge_kiwi.tools.search import SearchTool
+from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
+from ..helpers import json_loads
 
 
 class TestSearchTool:
@@ -15,50 +13,42 @@ class TestSearchTool:
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_local_success(self, temp_project_dir, sample_knowledge_file):
+    async def test_search_local_success(self, make_search_tool, temp_project_dir, sample_knowledge_file, empty_dir):
         """Test successful local search."""
-        tool = SearchTool()
-        
-        # Patch resolver to use temp directory
-        with patch.object(tool.resolver, 'project_knowledge_dir', temp_project_dir / ".ai" / "knowledge"), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")):
-            
-            result = await tool.execute({
-                "query": "test",
-                "source": "local",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert "results" in result_data
-            assert len(result_data["results"]) > 0
-            assert result_data["results"][0]["zettel_id"] == "042-test-entry"
+        # Point the resolver at the temp directory
+        tool = make_search_tool(temp_project_dir / ".ai" / "knowledge", empty_dir)
+        
+        result = await tool.execute({
+            "query": "test",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert "results" in result_data
+        assert len(result_data["results"]) > 0
+        assert result_data["results"][0]["zettel_id"] == "042-test-entry"
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_local_no_results(self, temp_project_dir):
+    async def test_search_local_no_results(self, make_search_tool, temp_project_dir, empty_dir):
         """Test local search with no results."""
-        tool = SearchTool()
-        
-        with patch.object(tool.resolver, 'project_knowledge_dir', temp_project_dir / ".ai" / "knowledge"), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")):
-            
-            result = await tool.execute({
-                "query": "nonexistent",
-                "source": "local",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["results_count"] == 0
-            assert result_data["results"] == []
+        tool = make_search_tool(temp_project_dir / ".ai" / "knowledge", empty_dir)
+        
+        result = await tool.execute({
+            "query": "nonexistent",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 0
+        assert result_data["results"] == []
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_registry_success(self, mock_supabase):
+    async def test_search_registry_success(self, make_search_tool, mock_supabase):
         """Test successful registry search."""
-        tool = SearchTool()
-        
         # Setup mock registry search
         mock_supabase.setup_rpc_search("test", [
             {
@@ -71,89 +61,127 @@ class TestSearchTool:
             }
         ])
         
-        with patch.object(tool.registry, 'client', mock_supabase):
-            result = await tool.execute({
-                "query": "test",
-                "source": "registry",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert "results" in result_data
-            assert len(result_data["results"]) > 0
-            assert result_data["results"][0]["zettel_id"] == "042-registry-entry"
+        tool = make_search_tool(client=mock_supabase)
+        
+        result = await tool.execute({
+            "query": "test",
+            "source": "registry",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert "results" in result_data
+        assert len(result_data["results"]) > 0
+        assert result_data["results"][0]["zettel_id"] == "042-registry-entry"
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_both_sources(self, temp_project_dir, sample_knowledge_file, mock_supabase):
-        """Test searching both local and registry sources."""
-        tool = SearchTool()
+    async def test_search_registry_cache(self, make_search_tool, mock_supabase):
+        """Test that repeated registry searches reuse results until invalidated."""
+        mock_supabase.setup_rpc_search("test", [
+            {
+                "zettel_id": "042-registry-entry",
+                "title": "Registry Entry",
+                "entry_type": "pattern",
+                "tags": ["test"],
+                "snippet": "Test snippet"
+            }
+        ])
         
+        tool = make_search_tool(client=mock_supabase)
+        arguments = {"query": "test", "source": "registry", "tags": ["b", "a"]}
+        
+        first = await tool.execute(arguments)
+        second = await tool.execute({**arguments, "tags": ["a", "b"]})
+        assert first == second
+        assert mock_supabase.rpc.call_count == 1
+        
+        tool.invalidate_cache()
+        await tool.execute(arguments)
+        assert mock_supabase.rpc.call_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_search_both_sources(self, make_search_tool, temp_project_dir, sample_knowledge_file, mock_supabase, empty_dir):
+        """Test searching both local and registry sources."""
         # Setup mock registry search
         mock_supabase.setup_rpc_search("test", [
             {
                 "zettel_id": "043-registry-entry",
-                "title": "Registry Entry",
+                "title": "Registry Test Entry",
                 "entry_type": "pattern",
                 "tags": ["test"],
                 "relevance_score": 0.8,
-                "snippet": "Registry snippet"
+                "snippet": "Registry test snippet"
             }
         ])
         
-        with patch.object(tool.resolver, 'project_knowledge_dir', temp_project_dir / ".ai" / "knowledge"), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")), \
-             patch.object(tool.registry, 'client', mock_supabase):
-            
-            result = await tool.execute({
-                "query": "test",
-                "source": ["local", "registry"],
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["results_count"] >= 2  # At least one from local and one from registry
+        tool = make_search_tool(temp_project_dir / ".ai" / "knowledge", empty_dir, client=mock_supabase)
+        
+        result = await tool.execute({
+            "query": "test",
+            "source": ["local", "registry"],
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] >= 2  # At least one from local and one from registry
+        assert {r["zettel_id"] for r in result_data["results"]} >= {"042-test-entry", "043-registry-entry"}
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_with_filters(self, temp_project_dir, sample_knowledge_file):
+    async def test_search_with_filters(self, make_search_tool, temp_project_dir, sample_knowledge_file, empty_dir):
         """Test search with entry_type and tags filters."""
-        tool = SearchTool()
-        
-        with patch.object(tool.resolver, 'project_knowledge_dir', temp_project_dir / ".ai" / "knowledge"), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")):
-            
-            result = await tool.execute({
-                "query": "test",
-                "source": "local",
-                "entry_type": "pattern",
-                "tags": ["test"],
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            # Should find the entry since it matches filters
-            assert result_data["results_count"] > 0
+        tool = make_search_tool(temp_project_dir / ".ai" / "knowledge", empty_dir)
+        
+        result = await tool.execute({
+            "query": "test",
+            "source": "local",
+            "entry_type": "pattern",
+            "tags": ["test"],
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        # Should find the entry since it matches filters
+        assert result_data["results_count"] > 0
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_missing_query(self):
+    async def test_search_batch(self, make_search_tool, temp_project_dir, sample_knowledge_file, empty_dir):
+        """Test that search_batch returns one result per query, in order."""
+        tool = make_search_tool(temp_project_dir / ".ai" / "knowledge", empty_dir)
+        
+        results = await tool.search_batch([
+            {"query": "test", "source": "local"},
+            {"query": "nonexistent", "source": "local"},
+            {"source": "local"}
+        ])
+    
+        assert [r.get("query") for r in results] == ["test", "nonexistent", None]
+        assert results[0]["results"][0]["zettel_id"] == "042-test-entry"
+        assert results[1]["results_count"] == 0
+        assert "error" in results[2]
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_search_missing_query(self, make_search_tool, mock_supabase, empty_dir):
         """Test search with missing query parameter."""
-        tool = SearchTool()
+        tool = make_search_tool(empty_dir, empty_dir, client=mock_supabase)
         
         result = await tool.execute({
             "source": "local"
         })
         
-        result_data = json.loads(result)
+        result_data = json_loads(result)
         assert "error" in result_data
         assert "query" in result_data["error"].lower()
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_invalid_source(self):
+    async def test_search_invalid_source(self, make_search_tool, mock_supabase, empty_dir):
         """Test search with invalid source."""
-        tool = SearchTool()
+        tool = make_search_tool(empty_dir, empty_dir, client=mock_supabase)
         
         result = await tool.execute({
             "query": "test",
@@ -161,22 +189,18 @@ class TestSearchTool:
         })
         
         # Should still work but only search valid sources
-        result_data = json.loads(result)
+        result_data = json_loads(result)
         assert "results" in result_data
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_with_category_filter(self, temp_project_dir):
+    async def test_search_with_category_filter(self, make_search_tool, temp_project_dir, empty_dir):
         """Test search with category filter."""
-        tool = SearchTool()
-        
         # Create entries in different categories
         base_dir = temp_project_dir / ".ai" / "knowledge"
         (base_dir / "patterns").mkdir(parents=True, exist_ok=True)
         (base_dir / "email-infrastructure" / "smtp").mkdir(parents=True, exist_ok=True)
         
-        from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
-        
         write_knowledge_file(
             file_path=base_dir / "patterns" / "001-pattern.md",
             zettel_id="001-pattern",
@@ -193,27 +217,24 @@ class TestSearchTool:
             entry_type="pattern"
         )
         
-        with patch.object(tool.resolver, 'project_knowledge_dir', base_dir), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")):
-            
-            result = await tool.execute({
-                "query": "content",
-                "source": "local",
-                "category": "email-infrastructure/smtp",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["results_count"] == 1
-            assert result_data["results"][0]["zettel_id"] == "002-spf"
-            assert result_data["results"][0]["category"] == "email-infrastructure/smtp"
+        tool = make_search_tool(base_dir, empty_dir)
+        
+        result = await tool.execute({
+            "query": "content",
+            "source": "local",
+            "category": "email-infrastructure/smtp",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 1
+        assert result_data["results"][0]["zettel_id"] == "002-spf"
+        assert result_data["results"][0]["category"] == "email-infrastructure/smtp"
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_registry_with_category(self, mock_supabase):
+    async def test_search_registry_with_category(self, make_search_tool, mock_supabase):
         """Test registry search with category filter."""
-        tool = SearchTool()
-        
         # Setup mock registry search with category
         mock_supabase.setup_rpc_search("test", [
             {
@@ -227,30 +248,27 @@ class TestSearchTool:
             }
         ])
         
-        with patch.object(tool.registry, 'client', mock_supabase):
-            result = await tool.execute({
-                "query": "test",
-                "source": "registry",
-                "category": "email-infrastructure/smtp",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert "results" in result_data
-            if len(result_data["results"]) > 0:
-                assert result_data["results"][0]["category"] == "email-infrastructure/smtp"
+        tool = make_search_tool(client=mock_supabase)
+        
+        result = await tool.execute({
+            "query": "test",
+            "source": "registry",
+            "category": "email-infrastructure/smtp",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 1
+        assert result_data["results"][0]["zettel_id"] == "042-category-entry"
+        assert result_data["results"][0]["category"] == "email-infrastructure/smtp"
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_multi_term_matching(self, temp_project_dir):
+    async def test_search_multi_term_matching(self, make_search_tool, temp_project_dir, empty_dir):
         """Test multi-term search requires all terms to match."""
-        tool = SearchTool()
-        
         base_dir = temp_project_dir / ".ai" / "knowledge"
         base_dir.mkdir(parents=True, exist_ok=True)
         
-        from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
-        
         # Create entry with both terms
         write_knowledge_file(
             file_path=base_dir / "001-jwt-auth.md",
@@ -269,41 +287,79 @@ class TestSearchTool:
             entry_type="pattern"
         )
         
-        with patch.object(tool.resolver, 'project_knowledge_dir', base_dir), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")):
-            
-            # Multi-term search should only match entry with both terms
-            result = await tool.execute({
-                "query": "JWT authentication",
-                "source": "local",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["results_count"] == 1
-            assert result_data["results"][0]["zettel_id"] == "001-jwt-auth"
-            
-            # Single term should match both
-            result = await tool.execute({
-                "query": "JWT",
-                "source": "local",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["results_count"] == 2
+        tool = make_search_tool(base_dir, empty_dir)
+        
+        # Multi-term search should only match entry with both terms
+        result = await tool.execute({
+            "query": "JWT authentication",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 1
+        assert result_data["results"][0]["zettel_id"] == "001-jwt-auth"
+        
+        # Single term should match both
+        result = await tool.execute({
+            "query": "JWT",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 2
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_relevance_scoring(self, temp_project_dir):
-        """Test that relevance scoring ranks results correctly."""
-        tool = SearchTool()
+    @pytest.mark.parametrize("file_count", [200, pytest.param(5000, marks=pytest.mark.slow)])
+    async def test_search_multi_term_matching_large_corpus(self, make_search_tool, temp_project_dir, empty_dir, file_count):
+        """Test multi-term matching when one match is buried in a large corpus."""
+        base_dir = temp_project_dir / ".ai" / "knowledge"
         
+        for i in range(file_count):
+            write_knowledge_file(
+                file_path=base_dir / f"category-{i % 10}" / f"{i:04d}-jwt-token.md",
+                zettel_id=f"{i:04d}-jwt-token",
+                title=f"JWT Token {i}",
+                content="JWT token structure and validation",
+                entry_type="pattern"
+            )
+        write_knowledge_file(
+            file_path=base_dir / "category-3" / "9999-jwt-auth.md",
+            zettel_id="9999-jwt-auth",
+            title="JWT Authentication",
+            content="JWT authentication patterns and best practices",
+            entry_type="pattern"
+        )
+        
+        tool = make_search_tool(base_dir, empty_dir)
+        
+        result = await tool.execute({
+            "query": "JWT authentication",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert [r["zettel_id"] for r in result_data["results"]] == ["9999-jwt-auth"]
+        
+        result = await tool.execute({
+            "query": "JWT",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 10
+
+    @pytest.mark.asyncio
+    @pytest.mark.unit
+    async def test_search_relevance_scoring(self, make_search_tool, temp_project_dir, empty_dir):
+        """Test that relevance scoring ranks results correctly."""
         base_dir = temp_project_dir / ".ai" / "knowledge"
         base_dir.mkdir(parents=True, exist_ok=True)
         
-        from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
-        
         # Create entry with exact title match (should score highest)
         write_knowledge_file(
             file_path=base_dir / "001-email-deliverability.md",
@@ -322,31 +378,28 @@ class TestSearchTool:
             entry_type="concept"
         )
         
-        with patch.object(tool.resolver, 'project_knowledge_dir', base_dir), \
-             patch.object(tool.resolver, 'user_knowledge_dir', Path("/tmp/empty")):
-            
-            result = await tool.execute({
-                "query": "email deliverability",
-                "source": "local",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert result_data["results_count"] == 2
-            
-            # First result should have higher relevance score
-            scores = [r.get("relevance_score", 0) for r in result_data["results"]]
-            assert scores[0] >= scores[1], "Results should be sorted by relevance"
-            
-            # Exact title match should be first
-            assert result_data["results"][0]["zettel_id"] == "001-email-deliverability"
+        tool = make_search_tool(base_dir, empty_dir)
+        
+        result = await tool.execute({
+            "query": "email deliverability",
+            "source": "local",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        assert result_data["results_count"] == 2
+        
+        # First result should have higher relevance score
+        scores = [r.get("relevance_score", 0) for r in result_data["results"]]
+        assert scores[0] >= scores[1], "Results should be sorted by relevance"
+        
+        # Exact title match should be first
+        assert result_data["results"][0]["zettel_id"] == "001-email-deliverability"
 
     @pytest.mark.asyncio
     @pytest.mark.unit
-    async def test_search_registry_multi_term(self, mock_supabase):
+    async def test_search_registry_multi_term(self, make_search_tool, mock_supabase):
         """Test registry search with multi-term matching."""
-        tool = SearchTool()
-        
         # Setup mock registry search with entries
         mock_supabase.setup_rpc_search("JWT authentication", [
             {
@@ -369,16 +422,15 @@ class TestSearchTool:
             }
         ])
         
-        with patch.object(tool.registry, 'client', mock_supabase):
-            result = await tool.execute({
-                "query": "JWT authentication",
-                "source": "registry",
-                "limit": 10
-            })
-            
-            result_data = json.loads(result)
-            assert "results" in result_data
-            # Should only match entry with both terms
-            if len(result_data["results"]) > 0:
-                assert result_data["results"][0]["zettel_id"] == "042-jwt-auth"
+        tool = make_search_tool(client=mock_supabase)
+        
+        result = await tool.execute({
+            "query": "JWT authentication",
+            "source": "registry",
+            "limit": 10
+        })
+        
+        result_data = json_loads(result)
+        # Should only match entry with both terms
+        assert [r["zettel_id"] for r in result_data["results"]] == ["042-jwt-auth"]
 
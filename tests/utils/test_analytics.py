@@ -4,12 +4,12 @@ Tests for analytics and logging utilities.
 
 import pytest
 import json
-import tempfile
-import shutil
+import os
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from unittest.mock import patch
 
+from knowledge_kiwi.utils import analytics
 from knowledge_kiwi.utils.analytics import (
     log_tool_execution,
     get_execution_history,
@@ -20,6 +20,24 @@ from knowledge_kiwi.utils.analytics import (
 )
 
 
+def _now() -> datetime:
+    """Current time in UTC, as log_tool_execution() timestamps it."""
+    return datetime.now(timezone.utc)
+
+
+def _write_history(history_file: Path, entries: list):
+    """Replace history_file with entries as JSONL, in a single write syscall."""
+    lines = [json.dumps(entry).encode("utf-8") + b"\n" for entry in entries]
+    fd = os.open(history_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if hasattr(os, "writev"):
+            os.writev(fd, lines)
+        else:
+            os.write(fd, b"".join(lines))
+    finally:
+        os.close(fd)
+
+
 class TestLogToolExecution:
     """Tests for log_tool_execution function."""
     
@@ -67,7 +85,9 @@ class TestLogToolExecution:
             assert entry["inputs"]["query"] == "test"
             assert entry["outputs"]["result_count"] == 10
             assert entry["metadata"]["zettel_id"] == "042-test"
-            assert "timestamp" in entry
+            # UTC with a fixed width, so timestamps sort as strings across DST changes
+            assert entry["timestamp"].endswith("+00:00")
+            assert len(entry["timestamp"]) == len("2026-01-01T00:00:00.000000+00:00")
     
     def test_log_tool_execution_with_error(self, temp_user_dir):
         """Test logging an execution with an error."""
@@ -111,6 +131,25 @@ class TestLogToolExecution:
             assert len(entry["inputs"]["content"]) < len(large_content)
             assert entry["inputs"]["content"].endswith("...")
     
+    def test_log_tool_execution_summarizes_bytes_inputs(self, temp_user_dir):
+        """Test that bytes inputs are logged as a decoded, truncated prefix."""
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            
+            log_tool_execution(
+                tool_name="manage",
+                status="success",
+                duration_sec=0.5,
+                inputs={"content": b"x" * 200, "short": b"ok"}
+            )
+            
+            with open(history_file, 'r') as f:
+                entry = json.loads(f.readline().strip())
+            
+            assert entry["inputs"]["content"] == "x" * 100 + "..."
+            assert entry["inputs"]["short"] == "ok"
+    
     def test_log_tool_execution_removes_none_values(self, temp_user_dir):
         """Test that None values are removed from entries."""
         with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
@@ -159,16 +198,14 @@ class TestGetExecutionHistory:
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
             # Write some entries
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": (now - timedelta(days=1)).isoformat(), "tool": "search", "status": "success"},
                 {"timestamp": (now - timedelta(days=2)).isoformat(), "tool": "get", "status": "success"},
                 {"timestamp": (now - timedelta(days=35)).isoformat(), "tool": "manage", "status": "success"},  # Too old
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             history = get_execution_history(days=30)
             
@@ -176,6 +213,49 @@ class TestGetExecutionHistory:
             assert len(history) == 2
             assert all(h["tool"] in ["search", "get"] for h in history)
     
+    def test_get_execution_history_time_ordered(self, temp_user_dir):
+        """Test the cutoff on a history appended in time order (bisected)."""
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            history_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            now = _now()
+            entries = [
+                {"timestamp": (now - timedelta(days=age)).isoformat(), "tool": f"t{age}"}
+                for age in [40, 35, 29, 2, 1]
+            ]
+            
+            _write_history(history_file, entries)
+            
+            assert [h["tool"] for h in get_execution_history(days=30)] == ["t1", "t2", "t29"]
+            assert get_execution_history(days=0) == []
+    
+    def test_get_execution_history_cutoff_on_whole_second(self, temp_user_dir, monkeypatch):
+        """Test that an entry exactly at the cutoff is excluded when now() has no microseconds."""
+        frozen = datetime(2026, 1, 10, 12, 0, 0, tzinfo=timezone.utc)
+        
+        class FrozenDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return frozen
+        
+        monkeypatch.setattr(analytics, "datetime", FrozenDatetime)
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            history_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            at_cutoff = (frozen - timedelta(days=7)).isoformat(timespec='microseconds')
+            after_cutoff = (frozen - timedelta(days=7, microseconds=-1)).isoformat(timespec='microseconds')
+            _write_history(history_file, [
+                {"timestamp": at_cutoff, "tool": "old", "status": "error"},
+                {"timestamp": after_cutoff, "tool": "new", "status": "error"},
+            ])
+            
+            assert [h["tool"] for h in get_execution_history(days=7)] == ["new"]
+            assert [f["tool"] for f in recent_failures()] == ["new"]
+    
     def test_get_execution_history_filters_by_tool(self, temp_user_dir):
         """Test filtering history by tool name."""
         with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
@@ -183,16 +263,14 @@ class TestGetExecutionHistory:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "search", "status": "success"},
                 {"timestamp": now.isoformat(), "tool": "get", "status": "success"},
                 {"timestamp": now.isoformat(), "tool": "search", "status": "error"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             history = get_execution_history(days=30, tool_name="search")
             
@@ -206,22 +284,99 @@ class TestGetExecutionHistory:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "search", "project": "/project/a"},
                 {"timestamp": now.isoformat(), "tool": "get", "project": "/project/b"},
                 {"timestamp": now.isoformat(), "tool": "manage", "project": "/project/a"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             history = get_execution_history(days=30, project="/project/a")
             
             assert len(history) == 2
             assert all(h["project"] == "/project/a" for h in history)
     
+    def test_get_execution_history_uses_index(self, temp_user_dir, monkeypatch):
+        """Test that indexed reads skip old entries and ignore a stale index."""
+        monkeypatch.setattr(analytics, "_HISTORY_INDEX_GRANULE", 1)
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            
+            for tool in ["search", "get", "link"]:
+                log_tool_execution(tool_name=tool, status="success", duration_sec=0.1, inputs={})
+            
+            marks = analytics._HistoryIndex(history_file).load()
+            assert len(marks) == 2
+            assert analytics._HistoryIndex(history_file).start_offset(_now().isoformat()) == marks[-1][0]
+            assert sorted(e["tool"] for e in get_execution_history()) == ["get", "link", "search"]
+            
+            # Rewritten without going through log_tool_execution
+            _write_history(history_file, [{"timestamp": _now().isoformat(), "tool": "help"}])
+            assert [e["tool"] for e in get_execution_history()] == ["help"]
+    
+    def test_get_execution_history_out_of_order_ignores_index(self, temp_user_dir):
+        """Test that entries before the index mark are still read when the order is broken."""
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            history_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            now = _now()
+            # The clock stepped back after "new" was logged
+            entries = [
+                {"timestamp": now.isoformat(timespec='microseconds'), "tool": "new"},
+                {"timestamp": (now - timedelta(days=40)).isoformat(timespec='microseconds'), "tool": "old"},
+                {"timestamp": (now - timedelta(days=41)).isoformat(timespec='microseconds'), "tool": "older"},
+            ]
+            _write_history(history_file, entries)
+            mark = len(json.dumps(entries[0]).encode("utf-8")) + 1
+            history_file.with_suffix(".idx").write_text(f"{mark}\t{entries[1]['timestamp']}\n")
+            
+            assert analytics._HistoryIndex(history_file).start_offset(
+                (now - timedelta(days=30)).isoformat(timespec='microseconds')
+            ) == mark
+            assert [e["tool"] for e in get_execution_history(days=30)] == ["new"]
+    
+    def test_log_tool_execution_reads_index_only_when_truncated(self, temp_user_dir, monkeypatch):
+        """Test that appends reuse the cached index and reload it after truncation."""
+        loads = []
+        real_load = analytics._HistoryIndex.load
+        monkeypatch.setattr(analytics._HistoryIndex, "load", lambda self: loads.append(1) or real_load(self))
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            
+            for tool in ["search", "get", "link"]:
+                log_tool_execution(tool_name=tool, status="success", duration_sec=0.1, inputs={})
+            assert len(loads) == 1
+            
+            history_file.write_bytes(b"")
+            log_tool_execution(tool_name="help", status="success", duration_sec=0.1, inputs={})
+            assert len(loads) == 2
+            assert [e["tool"] for e in get_execution_history()] == ["help"]
+    
+    def test_get_execution_history_parses_once(self, temp_user_dir):
+        """Test that repeated queries reuse the parsed history until it changes."""
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            
+            log_tool_execution(tool_name="search", status="success", duration_sec=0.1, inputs={})
+            misses = analytics._load_history.cache_info().misses
+            
+            get_execution_history()[0]["tool"] = "modified"
+            assert tool_stats()["search"]["total_executions"] == 1
+            assert get_execution_history()[0]["tool"] == "search"
+            assert analytics._load_history.cache_info().misses == misses + 1
+            
+            log_tool_execution(tool_name="get", status="success", duration_sec=0.1, inputs={})
+            assert len(get_execution_history()) == 2
+            # The parse for the pre-append history is not kept around
+            assert analytics._load_history.cache_info().currsize == 1
+    
     def test_get_execution_history_sorted_recent_first(self, temp_user_dir):
         """Test that history is sorted with most recent first."""
         with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
@@ -229,22 +384,38 @@ class TestGetExecutionHistory:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": (now - timedelta(hours=3)).isoformat(), "tool": "search"},
                 {"timestamp": (now - timedelta(hours=1)).isoformat(), "tool": "get"},
                 {"timestamp": (now - timedelta(hours=2)).isoformat(), "tool": "manage"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             history = get_execution_history(days=30)
             
             # Should be sorted by timestamp descending
             timestamps = [datetime.fromisoformat(h["timestamp"]) for h in history]
             assert timestamps == sorted(timestamps, reverse=True)
+    
+    def test_get_execution_history_limit(self, temp_user_dir):
+        """Test that limit returns only the most recent entries, newest first."""
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            history_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            now = _now()
+            entries = [
+                {"timestamp": (now - timedelta(hours=hours)).isoformat(), "tool": f"t{hours}"}
+                for hours in [3, 1, 4, 2]
+            ]
+            
+            _write_history(history_file, entries)
+            
+            assert [h["tool"] for h in get_execution_history(limit=2)] == ["t1", "t2"]
+            assert len(get_execution_history(limit=10)) == 4
 
 
 class TestToolStats:
@@ -257,7 +428,7 @@ class TestToolStats:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "search", "status": "success", "duration_sec": 0.1},
                 {"timestamp": now.isoformat(), "tool": "search", "status": "success", "duration_sec": 0.2},
@@ -265,9 +436,7 @@ class TestToolStats:
                 {"timestamp": now.isoformat(), "tool": "get", "status": "success", "duration_sec": 0.3},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             stats = tool_stats(days=30)
             
@@ -291,16 +460,14 @@ class TestToolStats:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "manage", "status": "error", "error": "Validation failed"},
                 {"timestamp": now.isoformat(), "tool": "manage", "status": "error", "error": "Validation failed"},
                 {"timestamp": now.isoformat(), "tool": "manage", "status": "error", "error": "Network error"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             stats = tool_stats(days=30)
             
@@ -330,16 +497,14 @@ class TestRecentFailures:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "search", "status": "success"},
                 {"timestamp": now.isoformat(), "tool": "get", "status": "error", "error": "Failed"},
                 {"timestamp": now.isoformat(), "tool": "manage", "status": "error", "error": "Validation failed"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             failures = recent_failures(count=10)
             
@@ -353,16 +518,14 @@ class TestRecentFailures:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "search", "status": "error", "error": "Error 1"},
                 {"timestamp": now.isoformat(), "tool": "get", "status": "error", "error": "Error 2"},
                 {"timestamp": now.isoformat(), "tool": "manage", "status": "error", "error": "Error 3"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             failures = recent_failures(count=2)
             
@@ -375,21 +538,39 @@ class TestRecentFailures:
             mock_get_file.return_value = history_file
             history_file.parent.mkdir(parents=True, exist_ok=True)
             
-            now = datetime.now()
+            now = _now()
             entries = [
                 {"timestamp": now.isoformat(), "tool": "search", "status": "error", "project": "/project/a"},
                 {"timestamp": now.isoformat(), "tool": "get", "status": "error", "project": "/project/b"},
             ]
             
-            with open(history_file, 'w') as f:
-                for entry in entries:
-                    f.write(json.dumps(entry) + '\n')
+            _write_history(history_file, entries)
             
             failures = recent_failures(count=10, project="/project/a")
             
             assert len(failures) == 1
             assert failures[0]["project"] == "/project/a"
     
+    def test_recent_failures_reads_backwards(self, temp_user_dir, monkeypatch):
+        """Test that recent_failures returns the newest failures across chunk boundaries."""
+        monkeypatch.setattr(analytics, "_REVERSE_CHUNK_SIZE", 16)
+        with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
+            history_file = temp_user_dir / ".runs" / "history.jsonl"
+            mock_get_file.return_value = history_file
+            history_file.parent.mkdir(parents=True, exist_ok=True)
+            
+            now = _now()
+            entries = [{"timestamp": (now - timedelta(days=8)).isoformat(), "tool": "old", "status": "error"}]
+            entries += [
+                {"timestamp": (now - timedelta(minutes=10 - i)).isoformat(), "tool": f"t{i}", "status": "error"}
+                for i in range(5)
+            ]
+            
+            _write_history(history_file, entries)
+            
+            assert [f["tool"] for f in recent_failures(count=3)] == ["t4", "t3", "t2"]
+            assert [f["tool"] for f in recent_failures(count=10)] == ["t4", "t3", "t2", "t1", "t0"]
+    
     def test_recent_failures_empty_history(self, temp_user_dir):
         """Test recent_failures with no history."""
         with patch('knowledge_kiwi.utils.analytics._get_history_file') as mock_get_file:
@@ -0,0 +1,194 @@
+"""
+Tests for KnowledgeIndex.
+"""
+
+import pytest
+import os
+
+from knowledge_kiwi.utils.index import KnowledgeIndex, index_path
+from knowledge_kiwi.utils.knowledge_resolver import KnowledgeResolver, write_knowledge_file
+
+
+def _write_entry(base_dir, category, zettel_id, title, content, **kwargs):
+    file_path = base_dir / category / f"{zettel_id}.md"
+    write_knowledge_file(
+        file_path=file_path,
+        zettel_id=zettel_id,
+        title=title,
+        content=content,
+        entry_type=kwargs.pop("entry_type", "pattern"),
+        **kwargs
+    )
+    return file_path
+
+
+class TestKnowledgeIndex:
+    """Tests for KnowledgeIndex."""
+
+    def test_sync_indexes_files(self, temp_project_dir):
+        """Test that sync picks up files and search returns them."""
+        _write_entry(temp_project_dir, "patterns", "001-jwt", "JWT Auth", "Token based authentication")
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.sync()
+            results = index.search(["authentication"])
+        finally:
+            index.close()
+
+        assert index_path(temp_project_dir).exists()
+        assert not list(temp_project_dir.glob("*.db*"))
+        assert [r["zettel_id"] for r in results] == ["001-jwt"]
+        assert results[0]["title"] == "JWT Auth"
+
+    def test_index_path_defaults_to_xdg_cache(self, temp_project_dir, temp_user_dir, monkeypatch):
+        """Test that indexes default to the XDG cache dir, outside ~/.knowledge-kiwi."""
+        monkeypatch.delenv("KNOWLEDGE_KIWI_CACHE_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(temp_user_dir / "xdg"))
+        assert index_path(temp_project_dir).parent == temp_user_dir / "xdg" / "knowledge-kiwi"
+
+        monkeypatch.delenv("XDG_CACHE_HOME")
+        monkeypatch.setattr("pathlib.Path.home", lambda: temp_user_dir)
+        assert index_path(temp_project_dir).parent == temp_user_dir / ".cache" / "knowledge-kiwi"
+
+    def test_sync_refreshes_modified_and_removed_files(self, temp_project_dir):
+        """Test that stale rows are re-parsed or dropped on sync."""
+        first = _write_entry(temp_project_dir, "patterns", "001-a", "Alpha", "original text")
+        second = _write_entry(temp_project_dir, "patterns", "002-b", "Beta", "original text")
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.sync()
+
+            _write_entry(temp_project_dir, "patterns", "001-a", "Alpha", "rewritten body")
+            os.utime(first, ns=(1, 1))
+            second.unlink()
+            index.sync()
+
+            assert index.search(["original"]) == []
+            assert [r["zettel_id"] for r in index.search(["rewritten"])] == ["001-a"]
+        finally:
+            index.close()
+
+    def test_sync_refreshes_same_size_rewrite(self, temp_project_dir):
+        """Test that a same-size rewrite restoring the old mtime is re-indexed."""
+        file_path = _write_entry(temp_project_dir, "patterns", "001-a", "Alpha", "first body")
+        st = file_path.stat()
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.sync()
+
+            _write_entry(temp_project_dir, "patterns", "001-a", "Alpha", "other body")
+            os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+            assert file_path.stat().st_size == st.st_size
+            index.sync()
+
+            assert index.search(["first"]) == []
+            assert [r["zettel_id"] for r in index.search(["other"])] == ["001-a"]
+        finally:
+            index.close()
+
+    def test_outdated_schema_is_rebuilt(self, temp_project_dir):
+        """Test that an index written with an older schema is dropped and rebuilt."""
+        _write_entry(temp_project_dir, "patterns", "001-jwt", "JWT Auth", "Token based authentication")
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.conn.execute("PRAGMA user_version = 1")
+        finally:
+            index.close()
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            assert index.conn.execute("PRAGMA user_version").fetchone()[0] == 2
+            index.sync()
+            assert [r["zettel_id"] for r in index.search(["authentication"])] == ["001-jwt"]
+        finally:
+            index.close()
+
+    def test_sync_category_only_touches_subtree(self, temp_project_dir):
+        """Test that a category sync leaves rows outside the category alone."""
+        _write_entry(temp_project_dir, "email/smtp", "001-spf", "SPF", "mail records")
+        other = _write_entry(temp_project_dir, "patterns", "002-jwt", "JWT", "mail tokens")
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.sync()
+            other.unlink()
+            _write_entry(temp_project_dir, "email/smtp", "003-dkim", "DKIM", "mail keys")
+            index.sync("email/smtp")
+
+            assert {r["zettel_id"] for r in index.search(["mail"])} == {"001-spf", "002-jwt", "003-dkim"}
+
+            index.sync()
+            assert {r["zettel_id"] for r in index.search(["mail"])} == {"001-spf", "003-dkim"}
+        finally:
+            index.close()
+
+    def test_sync_skips_hidden_and_empty_files(self, temp_project_dir):
+        """Test that hidden files and empty files are never indexed."""
+        _write_entry(temp_project_dir, "patterns", "001-jwt", "JWT", "token auth")
+        _write_entry(temp_project_dir, "patterns", ".002-jwt", "JWT Backup", "token auth")
+        emptied = _write_entry(temp_project_dir, "patterns", "003-jwt", "JWT Old", "token auth")
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.sync()
+            assert {r["zettel_id"] for r in index.search(["token"])} == {"001-jwt", "003-jwt"}
+
+            emptied.write_text("")
+            index.sync()
+            assert [r["zettel_id"] for r in index.search(["token"])] == ["001-jwt"]
+        finally:
+            index.close()
+
+    def test_search_short_terms_and_filters(self, temp_project_dir):
+        """Test short terms (below trigram width) and category/entry_type filters."""
+        _write_entry(temp_project_dir, "email/smtp", "001-spf", "SPF", "go check", entry_type="pattern")
+        _write_entry(temp_project_dir, "learnings", "002-go", "Go", "go notes", entry_type="learning")
+
+        index = KnowledgeIndex(temp_project_dir)
+        try:
+            index.sync()
+            assert len(index.search(["go"])) == 2
+            assert [r["zettel_id"] for r in index.search(["go"], category="email/smtp")] == ["001-spf"]
+            assert [r["zettel_id"] for r in index.search(["go"], entry_type="learning")] == ["002-go"]
+        finally:
+            index.close()
+
+    def test_resolver_index_matches_scan(self, temp_project_dir):
+        """Test that indexed search returns the same results as the file scan."""
+        base_dir = temp_project_dir / ".ai" / "knowledge"
+        _write_entry(base_dir, "patterns", "001-email", "Email Deliverability", "SPF and DKIM setup")
+        _write_entry(base_dir, "learnings", "002-dkim", "DKIM Keys", "Rotate email keys", tags=["email"])
+
+        indexed = KnowledgeResolver(project_root=temp_project_dir, use_index=True)
+        scanned = KnowledgeResolver(project_root=temp_project_dir, use_index=False)
+        indexed.user_knowledge_dir = scanned.user_knowledge_dir = temp_project_dir / "no-user"
+        try:
+            for query in ["email", "dkim", "email dkim", "xyz"]:
+                assert indexed.search_local(query) == scanned.search_local(query)
+        finally:
+            indexed.close()
+            scanned.close()
+        assert index_path(base_dir).exists()
+        assert not list(base_dir.glob("*.db*"))
+
+    def test_resolver_reuses_open_index(self, temp_project_dir):
+        """Test that the resolver keeps its index open and still sees new files."""
+        base_dir = temp_project_dir / ".ai" / "knowledge"
+        _write_entry(base_dir, "patterns", "001-email", "Email Deliverability", "SPF setup")
+        
+        resolver = KnowledgeResolver(project_root=temp_project_dir, use_index=True)
+        resolver.user_knowledge_dir = temp_project_dir / "no-user"
+        try:
+            assert [r["zettel_id"] for r in resolver.search_local("email")] == ["001-email"]
+            index = resolver._indexes[base_dir]
+            
+            _write_entry(base_dir, "learnings", "002-email", "Email Warmup", "Ramp volume")
+            assert {r["zettel_id"] for r in resolver.search_local("email")} == {"001-email", "002-email"}
+            assert resolver._indexes[base_dir] is index
+        finally:
+            resolver.close()
+        assert resolver._indexes == {}
@@ -0,0 +1,55 @@
+"""
+Tests for jsonio.
+"""
+
+import json
+
+import pytest
+
+from knowledge_kiwi.utils import jsonio
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def backend(request, monkeypatch):
+    """Run each test against orjson (when installed) and the stdlib fallback."""
+    if request.param == "orjson":
+        if jsonio.orjson is None:
+            pytest.skip("orjson not installed")
+    else:
+        monkeypatch.setattr(jsonio, "orjson", None)
+    return request.param
+
+
+class TestJsonio:
+    """Tests for dumps/loads."""
+
+    def test_round_trip_matches_stdlib(self, backend):
+        """Test that output parses to the same value the stdlib produces."""
+        value = {"query": "café", "results": [{"score": 0.5, "tags": ["a"]}], "none": None}
+        
+        assert jsonio.loads(jsonio.dumps(value)) == value
+        assert json.loads(jsonio.dumps(value, indent=2)) == json.loads(json.dumps(value, indent=2))
+        assert "\n  " in jsonio.dumps(value, indent=2)
+        assert jsonio.loads(jsonio.dumpb(value)) == value
+
+    def test_output_format(self, backend):
+        """Test that both backends write the same bytes."""
+        value = {"query": "café", "results": [1, {}], "none": None}
+        
+        assert jsonio.dumps(value) == '{"query":"café","results":[1,{}],"none":null}'
+        assert jsonio.dumpb(value) == '{"query":"café","results":[1,{}],"none":null}'.encode()
+        assert jsonio.dumps(value, indent=2) == (
+            '{\n  "query": "café",\n  "results": [\n    1,\n    {}\n  ],\n  "none": null\n}'
+        )
+
+    def test_non_finite_floats_written_as_null(self, backend):
+        """Test that NaN/Infinity become null rather than invalid JSON."""
+        value = {"score": float("nan"), "scores": [float("inf"), 1.5]}
+        
+        assert jsonio.loads(jsonio.dumps(value)) == {"score": None, "scores": [None, 1.5]}
+        assert jsonio.loads(jsonio.dumpb(value)) == {"score": None, "scores": [None, 1.5]}
+
+    def test_non_string_keys_fall_back(self, backend):
+        """Test that values orjson rejects are still serialized."""
+        assert json.loads(jsonio.dumps({1: "one"})) == {"1": "one"}
+        assert json.loads(jsonio.dumpb({1: "one"})) == {"1": "one"}
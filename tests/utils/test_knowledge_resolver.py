@@ -2,10 +2,9 @@
 Tests for KnowledgeResolver.
 """
 
+import os
 import pytest
 from pathlib import Path
-import tempfile
-import shutil
 import yaml
 
 from knowledge_kiwi.utils.knowledge_resolver import (
@@ -124,46 +123,35 @@ class TestKnowledgeResolver:
         assert "aws/lambda" in categories  # Nested
         assert len(categories) >= 6  # At least 6 (may include more if temp dir has others)
 
-    def test_resolve_entry_nested_category(self, temp_project_dir):
-        """Test resolving entry in nested category."""
+    def test_discover_categories_sees_nested_changes(self, temp_project_dir):
+        """Test that cached categories are refreshed when a nested directory changes."""
         resolver = KnowledgeResolver(project_root=temp_project_dir)
+        base_dir = temp_project_dir / ".ai" / "knowledge"
+        (base_dir / "email" / "smtp").mkdir(parents=True, exist_ok=True)
         
-        # Create entry in nested category
-        nested_dir = temp_project_dir / ".ai" / "knowledge" / "email-infrastructure" / "smtp"
-        nested_dir.mkdir(parents=True, exist_ok=True)
+        assert resolver.discover_categories(base_dir) == ["email", "email/smtp"]
+        assert resolver.discover_categories(base_dir) == ["email", "email/smtp"]
         
-        from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
-        file_path = nested_dir / "001-spf.md"
-        write_knowledge_file(
-            file_path=file_path,
-            zettel_id="001-spf",
-            title="SPF Records",
-            content="# SPF",
-            entry_type="pattern"
-        )
+        (base_dir / "email" / "smtp" / "dkim").mkdir()
+        assert resolver.discover_categories(base_dir) == ["email", "email/smtp", "email/smtp/dkim"]
+        
+        (base_dir / "email" / "smtp" / "dkim").rmdir()
+        assert resolver.discover_categories(base_dir) == ["email", "email/smtp"]
+
+    def test_resolve_entry_nested_category(self, nested_knowledge_project):
+        """Test resolving entry in nested category."""
+        resolver = KnowledgeResolver(project_root=nested_knowledge_project)
+        nested_dir = nested_knowledge_project / ".ai" / "knowledge" / "email-infrastructure" / "smtp"
         
         result = resolver.resolve_entry("001-spf", "local")
         
         assert result["location"] == "project"
-        assert result["path"] == file_path
+        assert result["path"] == nested_dir / "001-spf.md"
         assert result["path"].exists()
 
-    def test_search_local_nested_category(self, temp_project_dir):
+    def test_search_local_nested_category(self, nested_knowledge_project):
         """Test searching entries in nested categories."""
-        resolver = KnowledgeResolver(project_root=temp_project_dir)
-        
-        # Create entry in nested category
-        nested_dir = temp_project_dir / ".ai" / "knowledge" / "email-infrastructure" / "smtp"
-        nested_dir.mkdir(parents=True, exist_ok=True)
-        
-        from knowledge_kiwi.utils.knowledge_resolver import write_knowledge_file
-        write_knowledge_file(
-            file_path=nested_dir / "001-spf.md",
-            zettel_id="001-spf",
-            title="SPF Records",
-            content="# SPF Records\n\nSPF configuration",
-            entry_type="pattern"
-        )
+        resolver = KnowledgeResolver(project_root=nested_knowledge_project)
         
         results = resolver.search_local("SPF", limit=10)
         
@@ -247,6 +235,30 @@ Content here.
         assert result["zettel_id"] == "test"  # From filename
         assert "Content here." in result["content"]
 
+    def test_parse_file_cache_invalidated_on_change(self, temp_project_dir):
+        """Test that cached parses are refreshed when the file changes."""
+        file_path = temp_project_dir / "test.md"
+        file_path.write_text("---\ntitle: First\n---\nBody")
+        
+        first = parse_knowledge_file(file_path)
+        first["title"] = "Mutated"
+        assert parse_knowledge_file(file_path)["title"] == "First"
+        
+        file_path.write_text("---\ntitle: Second title\n---\nBody")
+        assert parse_knowledge_file(file_path)["title"] == "Second title"
+
+    def test_parse_file_cache_invalidated_on_same_size_rewrite(self, temp_project_dir):
+        """Test that a same-size rewrite with the old mtime is still re-parsed."""
+        file_path = temp_project_dir / "test.md"
+        file_path.write_text("---\ntitle: AAAA\n---\nBody")
+        st = file_path.stat()
+        assert parse_knowledge_file(file_path)["title"] == "AAAA"
+        
+        file_path.write_text("---\ntitle: BBBB\n---\nBody")
+        os.utime(file_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert file_path.stat().st_size == st.st_size
+        assert parse_knowledge_file(file_path)["title"] == "BBBB"
+
 
 class TestWriteKnowledgeFile:
     """Tests for write_knowledge_file function."""